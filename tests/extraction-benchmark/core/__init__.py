@@ -19,6 +19,7 @@ from .gemini_client import (
     ExtractionResult,
     ExtractionError,
     EXTRACTION_RESPONSE_SCHEMA,
+    get_client,
 )
 
 from .field_extractor import (
@@ -30,6 +31,10 @@ from .field_extractor import (
     Architecture,
 )
 
+from .llm_cache import cached_extract_fields, cached_extraction_test
+
+from .benchmark_loader import load_benchmark
+
 from .deduplicator import (
     deduplicate_boundary_fields,
     deduplicate_by_position,
@@ -53,6 +58,7 @@ __all__ = [
     "ExtractionResult",
     "ExtractionError",
     "EXTRACTION_RESPONSE_SCHEMA",
+    "get_client",
     # Field extractor
     "FieldExtractor",
     "ExtractorConfig",
@@ -60,6 +66,11 @@ __all__ = [
     "run_extraction_test",
     "PromptStyle",
     "Architecture",
+    # LLM cache
+    "cached_extract_fields",
+    "cached_extraction_test",
+    # Benchmark
+    "load_benchmark",
     # Deduplicator
     "deduplicate_boundary_fields",
     "deduplicate_by_position",
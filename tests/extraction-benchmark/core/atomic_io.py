@@ -0,0 +1,34 @@
+"""
+Atomic file writes for the on-disk caches and saved results.
+Readers (including other script runs) see either the old file or the
+complete new one, never a partial write.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Write data to path via a temp file in the same directory and a rename.
+
+    The temp file name comes from tempfile, so it is unique across
+    processes as well as threads.
+
+    Args:
+        path: Destination file (parent directories are created)
+        data: Complete file contents
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
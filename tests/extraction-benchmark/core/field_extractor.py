@@ -16,7 +16,7 @@ from .image_processor import (
     image_to_base64,
     QuadrantNumber,
 )
-from .gemini_client import GeminiClient, GeminiConfig, ExtractionResult, EXTRACTION_RESPONSE_SCHEMA
+from .gemini_client import ExtractionResult, EXTRACTION_RESPONSE_SCHEMA, get_client
 from .deduplicator import deduplicate_boundary_fields
 
 
@@ -91,19 +91,15 @@ class FieldExtractor:
     def __init__(self, config: ExtractorConfig):
         """Initialize extractor with configuration."""
         self.config = config
-        self.gemini_client = GeminiClient(
-            GeminiConfig(
-                model=config.model,
-                thinking_level=config.thinking_level
-            )
-        )
+        self.gemini_client = get_client(config.model, config.thinking_level)
         self.prompt_builder = get_prompt_builder(config.prompt_style)
 
     def extract_from_pdf(
         self,
         pdf_path: str,
         page_number: int = 0,
-        dpi: int = 150
+        dpi: int = 150,
+        page_image: Image.Image | None = None
     ) -> ExtractionTestResult:
         """
         Extract fields from a PDF page.
@@ -112,15 +108,17 @@ class FieldExtractor:
             pdf_path: Path to PDF file
             page_number: 0-indexed page number
             dpi: Resolution for PDF conversion
+            page_image: Already-rasterized page; skips PDF conversion so
+                callers can share one rasterization across configs (not modified)
 
         Returns:
             ExtractionTestResult with extracted fields
         """
-        # Convert PDF to image
-        image = pdf_page_to_image(pdf_path, page_number, dpi)
-
-        # Resize for Gemini
-        resized = resize_for_gemini(image)
+        # Convert PDF to image (unless the caller already has it)
+        if page_image is None:
+            image = pdf_page_to_image(pdf_path, page_number, dpi)
+        else:
+            image = page_image
 
         # Run extraction based on architecture
         if self.config.architecture == "single_page":
@@ -278,7 +276,9 @@ class FieldExtractor:
 def run_extraction_test(
     pdf_path: str,
     config: ExtractorConfig,
-    page_number: int = 0
+    page_number: int = 0,
+    page_image: Image.Image | None = None,
+    dpi: int = 150
 ) -> ExtractionTestResult:
     """
     Run a single extraction test with given configuration.
@@ -287,9 +287,11 @@ def run_extraction_test(
         pdf_path: Path to PDF file
         config: Extraction configuration
         page_number: 0-indexed page number
+        page_image: Optional pre-rasterized page (see extract_from_pdf)
+        dpi: Resolution for PDF conversion
 
     Returns:
         ExtractionTestResult
     """
     extractor = FieldExtractor(config)
-    return extractor.extract_from_pdf(pdf_path, page_number)
+    return extractor.extract_from_pdf(pdf_path, page_number, dpi, page_image)
@@ -7,6 +7,7 @@ Uses the new google-genai library.
 import os
 import time
 import json
+from functools import lru_cache
 from dataclasses import dataclass
 from typing import Literal
 
@@ -145,6 +146,24 @@ class GeminiClient:
             )
 
 
+@lru_cache(maxsize=16)
+def get_client(model: ModelName, thinking_level: ThinkingLevel) -> GeminiClient:
+    """
+    Get a shared client for a model/thinking level.
+
+    Reuses the underlying genai.Client (and its HTTP connections) across
+    calls instead of building a new one each time.
+
+    Args:
+        model: Gemini model name
+        thinking_level: Thinking level
+
+    Returns:
+        Memoized GeminiClient with default temperature/max tokens
+    """
+    return GeminiClient(GeminiConfig(model=model, thinking_level=thinking_level))
+
+
 class ExtractionError(Exception):
     """Error during field extraction."""
 
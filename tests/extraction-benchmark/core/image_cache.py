@@ -0,0 +1,95 @@
+"""
+Disk cache for rasterized, Gemini-ready PDF page images.
+Keyed on the PDF content, page and DPI so repeated script runs skip
+pdf2image/Poppler rasterization and the resize/JPEG encode.
+
+Full-resolution pages come from raster_cache, which shares the same
+directory and keys with visualize_benchmark.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from .atomic_io import write_atomic
+from .raster_cache import CACHE_DIR, make_key, get_page_image
+from .image_processor import resize_for_gemini, ProcessedImage
+
+
+@dataclass
+class PageBundle:
+    """A PDF page in both the forms the scripts use."""
+    image_base64: str  # Resized for Gemini (JPEG)
+    pil: Image.Image  # Full resolution, for visualizations
+    sha: str  # Cache key: PDF content hash, page and DPI
+
+
+def _load_processed(path: Path) -> ProcessedImage | None:
+    """Read a cached Gemini image, or None on a miss."""
+    try:
+        return ProcessedImage(**json.loads(path.read_text()))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save_processed(path: Path, processed: ProcessedImage):
+    """Cache a Gemini image with its dimensions."""
+    write_atomic(path, json.dumps({
+        "image_base64": processed.image_base64,
+        "width": processed.width,
+        "height": processed.height,
+    }).encode("utf-8"))
+
+
+def get_or_render(pdf_path: str, page_number: int = 0, dpi: int = 150) -> ProcessedImage:
+    """
+    Get a PDF page resized for Gemini, rendering it only on a cache miss.
+
+    Args:
+        pdf_path: Path to PDF file
+        page_number: 0-indexed page number
+        dpi: Resolution for conversion
+
+    Returns:
+        ProcessedImage with base64 encoded JPEG
+    """
+    key = make_key(pdf_path, page_number, dpi)
+    path = CACHE_DIR / f"{key}.json"
+
+    processed = _load_processed(path)
+    if processed is None:
+        processed = resize_for_gemini(get_page_image(pdf_path, page_number, dpi, key=key))
+        _save_processed(path, processed)
+
+    return processed
+
+
+def get_page_bundle(pdf_path: str, page_number: int = 0, dpi: int = 150) -> PageBundle:
+    """
+    Get a PDF page both resized for Gemini and at full resolution.
+
+    The full page is cached as a PNG (by raster_cache) next to the
+    Gemini image under the same key. On a miss the page is rasterized
+    once for both.
+
+    Args:
+        pdf_path: Path to PDF file
+        page_number: 0-indexed page number
+        dpi: Resolution for conversion
+
+    Returns:
+        PageBundle with the Gemini base64, full-resolution image and key
+    """
+    key = make_key(pdf_path, page_number, dpi)
+    json_path = CACHE_DIR / f"{key}.json"
+
+    processed = _load_processed(json_path)
+    page_image = get_page_image(pdf_path, page_number, dpi, key=key)
+
+    if processed is None:
+        processed = resize_for_gemini(page_image)
+        _save_processed(json_path, processed)
+
+    return PageBundle(image_base64=processed.image_base64, pil=page_image, sha=key)
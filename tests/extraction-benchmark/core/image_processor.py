@@ -9,7 +9,6 @@ from dataclasses import dataclass
 from typing import Literal
 
 from PIL import Image
-from pdf2image import convert_from_path
 
 
 QuadrantNumber = Literal[1, 2, 3, 4]
@@ -57,6 +56,9 @@ def pdf_page_to_image(pdf_path: str, page_number: int = 0, dpi: int = 150) -> Im
     Returns:
         PIL Image of the page
     """
+    # Deferred so cached/decoded images never need Poppler bindings loaded
+    from pdf2image import convert_from_path
+
     images = convert_from_path(
         pdf_path,
         dpi=dpi,
@@ -0,0 +1,265 @@
+"""
+Content-addressable disk cache for Gemini extraction calls.
+Keyed on everything that determines the response, so re-running a script
+with an unchanged model, thinking level, prompt and image skips the API.
+Whole extraction tests (run_extraction_test) can be cached the same way.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from PIL import Image
+
+from . import image_cache
+from .atomic_io import write_atomic
+from .gemini_client import GeminiConfig, ExtractionResult, get_client
+from .field_extractor import (
+    ExtractorConfig,
+    ExtractionTestResult,
+    get_prompt_builder,
+    run_extraction_test,
+)
+
+
+CACHE_DIR = Path(__file__).parent.parent / "results" / ".llm_cache"
+
+# Part of every key. The prompt text is already hashed, so edits to the
+# prompt builders miss on their own; bump this when something else changes
+# what a response should be (response schema, parsing in GeminiClient)
+PROMPT_VERSION = "v1"
+
+# Toggled off by the scripts' --no-cache flag
+_enabled = True
+
+
+def disable():
+    """Bypass the cache for the rest of this process (reads and writes)."""
+    global _enabled
+    _enabled = False
+
+
+def make_key(model: str, thinking_level: str, prompt: str, image_base64: str) -> str:
+    """
+    Build the cache key for an extraction call.
+
+    Each part is length-prefixed before hashing so that different splits
+    of the same bytes can never produce the same key. PROMPT_VERSION is
+    hashed first, so bumping it orphans every existing entry.
+
+    Args:
+        model: Gemini model name
+        thinking_level: Thinking level
+        prompt: Full prompt text
+        image_base64: Base64 encoded image
+
+    Returns:
+        SHA-256 hex digest
+    """
+    return _hash_parts((PROMPT_VERSION, model, thinking_level, prompt, image_base64))
+
+
+def _hash_parts(parts: tuple[str, ...]) -> str:
+    """SHA-256 over length-prefixed UTF-8 parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def get(key: str) -> dict | None:
+    """
+    Look up a cached value.
+
+    Args:
+        key: Key from make_key()
+
+    Returns:
+        Cached value, or None on a miss
+    """
+    try:
+        entry = json.loads((CACHE_DIR / f"{key}.json").read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return entry["value"]
+
+
+def put(key: str, value: dict, metadata: dict | None = None):
+    """
+    Store a value, with a UTC timestamp and metadata as an audit trail.
+
+    Args:
+        key: Key from make_key()
+        value: JSON-serializable value
+        metadata: Optional context (config name, prompt variant, ...)
+    """
+    entry = {
+        "version": PROMPT_VERSION,
+        "cached_at": datetime.now(timezone.utc).isoformat(),
+        "metadata": metadata or {},
+        "value": value,
+    }
+
+    write_atomic(CACHE_DIR / f"{key}.json", json.dumps(entry).encode("utf-8"))
+
+
+def invalidate_by_version(version: str | None) -> int:
+    """
+    Delete cached entries written under a given PROMPT_VERSION.
+
+    Entries from a superseded version can never be hit again, so this just
+    reclaims their disk space.
+
+    Args:
+        version: Version to remove; None removes entries that predate
+            versioning
+
+    Returns:
+        Number of entries deleted
+    """
+    removed = 0
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            entry = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        if entry.get("version") == version:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def cached_extract_fields(
+    config: GeminiConfig,
+    image_base64: str,
+    prompt: str,
+    metadata: dict | None = None
+) -> ExtractionResult:
+    """
+    GeminiClient.extract_fields with the disk cache in front of it.
+
+    The shared client for the model/thinking level is only fetched on a
+    cache miss. Only successful responses are cached.
+
+    Args:
+        config: Gemini model/thinking configuration
+        image_base64: Base64 encoded image (JPEG)
+        prompt: Extraction prompt
+        metadata: Optional context stored alongside the cached response
+
+    Returns:
+        ExtractionResult (duration_ms is that of the original API call)
+    """
+    key = make_key(config.model, config.thinking_level, prompt, image_base64)
+
+    if _enabled:
+        cached = get(key)
+        if cached is not None:
+            return ExtractionResult(**cached)
+
+    result = get_client(config.model, config.thinking_level).extract_fields(
+        image_base64, prompt
+    )
+
+    if _enabled:
+        put(key, asdict(result), {
+            "model": config.model,
+            "thinking_level": config.thinking_level,
+            **(metadata or {}),
+        })
+
+    return result
+
+
+def make_extraction_test_key(
+    pdf_path: str,
+    config: ExtractorConfig,
+    page_number: int,
+    dpi: int = 150
+) -> str:
+    """
+    Build the cache key for a whole extraction test.
+
+    Covers the PDF content and page, every ExtractorConfig field and the
+    prompt text for each quadrant, so prompt edits miss like they do in
+    make_key().
+
+    Args:
+        pdf_path: Path to PDF file
+        config: Extraction configuration
+        page_number: 0-indexed page number
+        dpi: Resolution the page is rasterized at
+
+    Returns:
+        SHA-256 hex digest
+    """
+    prompt_builder = get_prompt_builder(config.prompt_style)
+    prompts = [prompt_builder(quadrant=quadrant) for quadrant in (None, 1, 2, 3, 4)]
+
+    return _hash_parts((
+        PROMPT_VERSION,
+        "run_extraction_test",
+        image_cache.make_key(pdf_path, page_number, dpi),
+        json.dumps(asdict(config), sort_keys=True),
+        *prompts,
+    ))
+
+
+def cached_extraction_test(
+    pdf_path: str,
+    config: ExtractorConfig,
+    page_number: int = 0,
+    page_image: Image.Image | None = None,
+    dpi: int = 150
+) -> ExtractionTestResult:
+    """
+    run_extraction_test with the disk cache in front of it.
+
+    Only tests that completed without an error are cached.
+
+    Args:
+        pdf_path: Path to PDF file
+        config: Extraction configuration
+        page_number: 0-indexed page number
+        page_image: Optional pre-rasterized page (only used on a miss)
+        dpi: Resolution for PDF conversion (must match page_image's)
+
+    Returns:
+        ExtractionTestResult (total_duration_ms is that of the original run)
+    """
+    # The key hashes the whole PDF, so don't build it when caching is off
+    if not _enabled:
+        return run_extraction_test(pdf_path, config, page_number, page_image, dpi)
+
+    key = make_extraction_test_key(pdf_path, config, page_number, dpi)
+
+    cached = get(key)
+    if cached is not None:
+        return ExtractionTestResult(
+            config=config,
+            fields=cached["fields"],
+            raw_quadrant_results=[
+                ExtractionResult(**raw) for raw in cached["raw_quadrant_results"]
+            ],
+            total_duration_ms=cached["total_duration_ms"],
+        )
+
+    result = run_extraction_test(pdf_path, config, page_number, page_image, dpi)
+
+    if result.error is None:
+        put(key, {
+            "fields": result.fields,
+            "raw_quadrant_results": [asdict(raw) for raw in result.raw_quadrant_results],
+            "total_duration_ms": result.total_duration_ms,
+        }, {
+            "pdf_path": pdf_path,
+            "page_number": page_number,
+            "dpi": dpi,
+            **asdict(config),
+        })
+
+    return result
@@ -0,0 +1,84 @@
+"""
+Disk cache for full-resolution PDF page rasterizations.
+Keyed on the PDF content, page and DPI so repeated runs of the benchmark
+scripts and visualize_benchmark skip pdf2image/Poppler entirely.
+"""
+
+import hashlib
+import io
+from pathlib import Path
+
+from PIL import Image
+
+from .atomic_io import write_atomic
+
+
+CACHE_DIR = Path(__file__).parent.parent / "results" / ".image_cache"
+
+
+def make_key(pdf_path: str, page_number: int, dpi: int) -> str:
+    """
+    Build the cache key for a PDF page.
+
+    Args:
+        pdf_path: Path to PDF file
+        page_number: 0-indexed page number
+        dpi: Resolution for conversion
+
+    Returns:
+        "<sha256 of PDF bytes>_<page>_<dpi>"
+    """
+    pdf_hash = hashlib.sha256(Path(pdf_path).read_bytes()).hexdigest()
+    return f"{pdf_hash}_{page_number}_{dpi}"
+
+
+def rasterize(pdf_path: str, page_number: int = 0, dpi: int = 150) -> Image.Image:
+    """
+    Rasterize a PDF page with pdf2image, bypassing the cache.
+
+    Args:
+        pdf_path: Path to PDF file
+        page_number: 0-indexed page number
+        dpi: Resolution for conversion
+
+    Returns:
+        PIL Image of the page
+    """
+    # Deferred so cache hits never need Poppler bindings loaded
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number + 1, last_page=page_number + 1)
+    if not images:
+        raise ValueError(f"Could not convert page {page_number + 1} from PDF")
+    return images[0]
+
+
+def get_page_image(pdf_path: str, page_number: int = 0, dpi: int = 150, key: str | None = None) -> Image.Image:
+    """
+    Get a PDF page as an RGB image, rasterizing it only on a cache miss.
+
+    Args:
+        pdf_path: Path to PDF file
+        page_number: 0-indexed page number
+        dpi: Resolution for conversion
+        key: Precomputed make_key() result, to avoid re-hashing the PDF
+
+    Returns:
+        PIL Image of the page (a fresh copy; safe to modify)
+    """
+    png_path = CACHE_DIR / f"{key or make_key(pdf_path, page_number, dpi)}.png"
+
+    try:
+        with Image.open(png_path) as cached:
+            return cached.convert("RGB")
+    except OSError:
+        pass
+
+    page_image = rasterize(pdf_path, page_number, dpi)
+
+    # Fast zlib level: the cache is read back far more often than written
+    buffer = io.BytesIO()
+    page_image.save(buffer, format="PNG", compress_level=1)
+    write_atomic(png_path, buffer.getvalue())
+
+    return page_image
@@ -4,20 +4,26 @@ Evaluation modules for extraction benchmark.
 
 from .scorer import (
     score_extraction,
+    prepare_ground_truth,
+    warm_iou_kernel,
     match_fields,
     calculate_iou,
     calculate_label_similarity,
     types_compatible,
     ExtractionScore,
     FieldMatch,
+    PreparedGroundTruth,
 )
 
 __all__ = [
     "score_extraction",
+    "prepare_ground_truth",
+    "warm_iou_kernel",
     "match_fields",
     "calculate_iou",
     "calculate_label_similarity",
     "types_compatible",
     "ExtractionScore",
     "FieldMatch",
+    "PreparedGroundTruth",
 ]
@@ -5,11 +5,37 @@ All metrics are percentage-based (0-100%).
 """
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Union
 import Levenshtein
 from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Below this many (pred x truth) cells, NumPy per-op overhead dominates the
+# IoU matrix build, so the fused Numba kernel is used when available
+NUMBA_IOU_MAX_CELLS = 1000
+
+# Matchings with at least this many (pred x truth) cells and fewer than this
+# fraction of pairs above the IoU threshold use the sparse solver
+SPARSE_ASSIGNMENT_MIN_CELLS = 25000
+SPARSE_ASSIGNMENT_MAX_DENSITY = 0.5
+
+
+# Type pairs that are acceptable alternatives for each other (normalized)
+_COMPATIBLE_PAIRS = frozenset({
+    ("text", "textarea"),  # text is acceptable for textarea
+    ("textarea", "text"),  # textarea could be used for text
+    ("date", "linkeddate"),  # date fallback for linkedDate
+    ("linkeddate", "date"),  # linkedDate for simple date
+})
+
 
 @dataclass
 class FieldMatch:
@@ -64,6 +90,28 @@ Matched: {len(self.matched_fields)}, Missed: {len(self.missed_fields)}, Extra: {
 """
 
 
+@dataclass(frozen=True)
+class PreparedGroundTruth:
+    """
+    Ground truth resolved once into arrays for repeated scoring.
+
+    Build with prepare_ground_truth() and pass in place of the raw field
+    list so table/date coordinate resolution and label/type normalization
+    are not redone for every scored extraction.
+    """
+    boxes: np.ndarray  # (M, 4) float64 as left, top, right, bottom
+    labels: np.ndarray  # (M,) object, normalized label or None if empty
+    types: np.ndarray  # (M,) object, normalized field type
+    is_table: np.ndarray  # (M,) bool
+    raw: list[dict]  # Original field dicts
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+
+GroundTruth = Union[PreparedGroundTruth, list[dict]]
+
+
 def calculate_iou(pred_coords: dict, truth_coords: dict) -> float:
     """
     Calculate Intersection over Union for two bounding boxes.
@@ -136,6 +184,24 @@ def calculate_label_similarity(pred_label: str, truth_label: str) -> float:
     return Levenshtein.ratio(norm_pred, norm_truth)
 
 
+def _normalize_label(label: str) -> Optional[str]:
+    """Normalize a label for comparison, or None if it is empty."""
+    if not label:
+        return None
+    return label.lower().strip()
+
+
+def _label_similarity_norm(pred: Optional[str], truth: Optional[str]) -> float:
+    """calculate_label_similarity for labels from _normalize_label."""
+    if pred is None or truth is None:
+        return 0.0
+
+    if pred == truth:
+        return 1.0
+
+    return Levenshtein.ratio(pred, truth)
+
+
 def types_compatible(pred_type: str, truth_type: str) -> bool:
     """
     Check if predicted type is compatible with ground truth type.
@@ -152,27 +218,22 @@ def types_compatible(pred_type: str, truth_type: str) -> bool:
     Returns:
         True if types are compatible
     """
-    # Normalize to lowercase
-    pred = pred_type.lower().strip()
-    truth = truth_type.lower().strip()
+    return _types_compatible_norm(_normalize_type(pred_type), _normalize_type(truth_type))
+
+
+def _normalize_type(field_type: str) -> str:
+    """Normalize a field type for comparison (lowercase, stripped)."""
+    return field_type.lower().strip()
 
-    if pred == truth:
-        return True
-
-    # Define compatible mappings
-    compatible_pairs = {
-        ("text", "textarea"),  # text is acceptable for textarea
-        ("textarea", "text"),  # textarea could be used for text
-        ("date", "linkeddate"),  # date fallback for linkedDate
-        ("linkeddate", "date"),  # linkedDate for simple date
-    }
 
-    return (pred, truth) in compatible_pairs or (truth, pred) in compatible_pairs
+def _types_compatible_norm(pred: str, truth: str) -> bool:
+    """types_compatible for already-normalized type strings."""
+    return pred == truth or (pred, truth) in _COMPATIBLE_PAIRS
 
 
 def match_fields(
     predicted: list[dict],
-    ground_truth: list[dict],
+    ground_truth: GroundTruth,
     iou_threshold: float = 0.1
 ) -> tuple[list[FieldMatch], list[dict], list[dict]]:
     """
@@ -182,83 +243,58 @@ def match_fields(
 
     Args:
         predicted: List of predicted field dicts
-        ground_truth: List of ground truth field dicts
+        ground_truth: Ground truth field dicts or a PreparedGroundTruth
         iou_threshold: Minimum IoU to consider a match
 
     Returns:
         Tuple of (matched_pairs, missed_fields, extra_fields)
     """
-    if not predicted or not ground_truth:
-        return [], ground_truth.copy(), predicted.copy()
-
-    n_pred = len(predicted)
-    n_truth = len(ground_truth)
-
-    # Build cost matrix (negative score since we minimize)
-    cost_matrix = np.zeros((n_pred, n_truth))
+    truth = _as_prepared(ground_truth)
 
-    for i, pred in enumerate(predicted):
-        pred_coords = pred.get("coordinates", pred.get("box", {}))
-        pred_label = pred.get("label", "")
+    if not predicted or not truth.raw:
+        return [], list(truth.raw), predicted.copy()
 
-        for j, truth in enumerate(ground_truth):
-            truth_coords = truth.get("coordinates", {})
-
-            # For special types, get coords from nested structure
-            if "tableConfig" in truth:
-                truth_coords = truth["tableConfig"].get("coordinates", {})
-            elif "dateSegments" in truth and not truth_coords:
-                # Calculate bounding box from segments
-                truth_coords = _bounding_box_from_segments(truth["dateSegments"])
-
-            truth_label = truth.get("label", "")
+    n_pred = len(predicted)
+    n_truth = len(truth)
 
-            # Calculate matching score
-            iou = calculate_iou(pred_coords, truth_coords)
-            label_sim = calculate_label_similarity(pred_label, truth_label)
+    # Normalize field types and labels once per prediction
+    pred_norm = tuple(
+        _normalize_type(p.get("fieldType", p.get("type", "unknown"))) for p in predicted
+    )
+    pred_labels = [_normalize_label(p.get("label", "")) for p in predicted]
+    pred_boxes = np.array(
+        [_box_from_coords(p.get("coordinates", p.get("box", {}))) for p in predicted],
+        dtype=np.float64
+    )
 
-            # Combined score (weighted)
-            score = 0.6 * iou + 0.4 * label_sim
+    # Build score matrices (IoU, label similarity, combined)
+    iou_matrix = _iou_matrix(pred_boxes, truth.boxes)
+    label_matrix = np.zeros((n_pred, n_truth))
 
-            # Only consider if IoU is above threshold
-            if iou < iou_threshold:
-                score = 0.0
+    for i, pred_label in enumerate(pred_labels):
+        for j, truth_label in enumerate(truth.labels):
+            label_matrix[i, j] = _label_similarity_norm(pred_label, truth_label)
 
-            cost_matrix[i, j] = -score  # Negative for minimization
+    # Combined score (weighted), only considered if IoU is above threshold
+    valid = iou_matrix >= iou_threshold
+    score_matrix = np.where(valid, 0.6 * iou_matrix + 0.4 * label_matrix, 0.0)
 
-    # Run Hungarian algorithm
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    row_ind, col_ind = _solve_assignment(score_matrix, valid)
 
     matched = []
     matched_pred_indices = set()
     matched_truth_indices = set()
 
     for pred_idx, truth_idx in zip(row_ind, col_ind):
-        if -cost_matrix[pred_idx, truth_idx] > 0:  # Valid match
-            pred = predicted[pred_idx]
-            truth = ground_truth[truth_idx]
-
-            pred_coords = pred.get("coordinates", pred.get("box", {}))
-            truth_coords = truth.get("coordinates", {})
-
-            if "tableConfig" in truth:
-                truth_coords = truth["tableConfig"].get("coordinates", {})
-            elif "dateSegments" in truth and not truth_coords:
-                truth_coords = _bounding_box_from_segments(truth["dateSegments"])
+        if score_matrix[pred_idx, truth_idx] > 0:  # Valid match
+            iou = float(iou_matrix[pred_idx, truth_idx])
+            label_sim = float(label_matrix[pred_idx, truth_idx])
 
-            iou = calculate_iou(pred_coords, truth_coords)
-            label_sim = calculate_label_similarity(
-                pred.get("label", ""),
-                truth.get("label", "")
-            )
-
-            pred_type = pred.get("fieldType", pred.get("type", "unknown"))
-            truth_type = truth.get("fieldType", truth.get("type", "unknown"))
-            type_correct = types_compatible(pred_type, truth_type)
+            type_correct = _types_compatible_norm(pred_norm[pred_idx], truth.types[truth_idx])
 
             matched.append(FieldMatch(
-                predicted=pred,
-                ground_truth=truth,
+                predicted=predicted[pred_idx],
+                ground_truth=truth.raw[truth_idx],
                 iou=iou,
                 label_similarity=label_sim,
                 type_correct=type_correct
@@ -268,12 +304,207 @@ def match_fields(
             matched_truth_indices.add(truth_idx)
 
     # Collect unmatched
-    missed = [ground_truth[i] for i in range(n_truth) if i not in matched_truth_indices]
+    missed = [truth.raw[i] for i in range(n_truth) if i not in matched_truth_indices]
     extra = [predicted[i] for i in range(n_pred) if i not in matched_pred_indices]
 
     return matched, missed, extra
 
 
+def prepare_ground_truth(ground_truth: list[dict]) -> PreparedGroundTruth:
+    """
+    Resolve ground truth fields into a PreparedGroundTruth.
+
+    Args:
+        ground_truth: List of ground truth field dicts
+
+    Returns:
+        PreparedGroundTruth ready to pass to match_fields / score_extraction
+    """
+    return PreparedGroundTruth(
+        boxes=np.array(
+            [_box_from_coords(_truth_coords(t)) for t in ground_truth],
+            dtype=np.float64
+        ).reshape(-1, 4),
+        labels=np.array(
+            [_normalize_label(t.get("label", "")) for t in ground_truth],
+            dtype=object
+        ),
+        types=np.array(
+            [_normalize_type(t.get("fieldType", t.get("type", "unknown"))) for t in ground_truth],
+            dtype=object
+        ),
+        is_table=np.array(
+            [t.get("fieldType") == "table" for t in ground_truth],
+            dtype=bool
+        ),
+        raw=list(ground_truth),
+    )
+
+
+def _as_prepared(ground_truth: GroundTruth) -> PreparedGroundTruth:
+    """Return ground truth as a PreparedGroundTruth, preparing it if needed."""
+    if isinstance(ground_truth, PreparedGroundTruth):
+        return ground_truth
+    return prepare_ground_truth(ground_truth)
+
+
+def _truth_coords(truth: dict) -> dict:
+    """Resolve the coordinates of a ground truth field."""
+    truth_coords = truth.get("coordinates", {})
+
+    # For special types, get coords from nested structure
+    if "tableConfig" in truth:
+        truth_coords = truth["tableConfig"].get("coordinates", {})
+    elif "dateSegments" in truth and not truth_coords:
+        # Calculate bounding box from segments
+        truth_coords = _bounding_box_from_segments(truth["dateSegments"])
+
+    return truth_coords
+
+
+def _box_from_coords(coords: dict) -> tuple[float, float, float, float]:
+    """Convert {left, top, width, height} to (left, top, right, bottom)."""
+    left = coords.get("left", 0)
+    top = coords.get("top", 0)
+    return (left, top, left + coords.get("width", 0), top + coords.get("height", 0))
+
+
+def _iou_matrix_np(pred_boxes: np.ndarray, truth_boxes: np.ndarray) -> np.ndarray:
+    """
+    IoU of every predicted box against every ground truth box.
+
+    Vectorized calculate_iou over (left, top, right, bottom) box arrays.
+
+    Args:
+        pred_boxes: (N, 4) predicted boxes
+        truth_boxes: (M, 4) ground truth boxes
+
+    Returns:
+        (N, M) IoU matrix (0.0 to 1.0)
+    """
+    p = pred_boxes[:, None, :]
+    t = truth_boxes[None, :, :]
+
+    inter_w = np.minimum(p[..., 2], t[..., 2]) - np.maximum(p[..., 0], t[..., 0])
+    inter_h = np.minimum(p[..., 3], t[..., 3]) - np.maximum(p[..., 1], t[..., 1])
+    inter_area = np.where((inter_w > 0) & (inter_h > 0), inter_w * inter_h, 0.0)
+
+    p_area = (p[..., 2] - p[..., 0]) * (p[..., 3] - p[..., 1])
+    t_area = (t[..., 2] - t[..., 0]) * (t[..., 3] - t[..., 1])
+    union_area = p_area + t_area - inter_area
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union_area > 0, inter_area / union_area, 0.0)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _iou_matrix_nb(pred_boxes, truth_boxes, out):
+        """Fused-loop _iou_matrix_np writing into a preallocated (N, M) array."""
+        for i in range(pred_boxes.shape[0]):
+            p_left, p_top, p_right, p_bottom = pred_boxes[i]
+            p_area = (p_right - p_left) * (p_bottom - p_top)
+
+            for j in range(truth_boxes.shape[0]):
+                t_left, t_top, t_right, t_bottom = truth_boxes[j]
+
+                inter_w = min(p_right, t_right) - max(p_left, t_left)
+                inter_h = min(p_bottom, t_bottom) - max(p_top, t_top)
+                if inter_w <= 0 or inter_h <= 0:
+                    out[i, j] = 0.0
+                    continue
+
+                inter_area = inter_w * inter_h
+                union_area = p_area + (t_right - t_left) * (t_bottom - t_top) - inter_area
+                out[i, j] = inter_area / union_area if union_area > 0 else 0.0
+else:
+    _iou_matrix_nb = None
+
+
+def _iou_matrix(pred_boxes: np.ndarray, truth_boxes: np.ndarray) -> np.ndarray:
+    """IoU matrix, using the Numba kernel for small problems when available."""
+    n_pred, n_truth = len(pred_boxes), len(truth_boxes)
+
+    if _iou_matrix_nb is not None and n_pred * n_truth < NUMBA_IOU_MAX_CELLS:
+        out = np.empty((n_pred, n_truth))
+        _iou_matrix_nb(pred_boxes, truth_boxes, out)
+        return out
+
+    return _iou_matrix_np(pred_boxes, truth_boxes)
+
+
+def warm_iou_kernel() -> None:
+    """
+    Compile the Numba IoU kernel up front.
+
+    Call once at startup so the first scored extraction does not pay the
+    compile cost. No-op if Numba is not installed.
+    """
+    if _iou_matrix_nb is not None:
+        box = np.zeros((1, 4))
+        _iou_matrix_nb(box, box, np.empty((1, 1)))
+
+
+def _solve_assignment(
+    score_matrix: np.ndarray,
+    valid: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Solve the max-score assignment, picking a solver by problem size.
+
+    Small and mid-size problems use scipy's dense Jonker-Volgenant solver.
+    Large problems where most pairs fall below the IoU threshold switch to
+    a sparse solver over the valid pairs only.
+
+    Args:
+        score_matrix: (n_pred, n_truth) scores, zero where not valid
+        valid: (n_pred, n_truth) mask of pairs above the IoU threshold
+
+    Returns:
+        Tuple of (row_indices, col_indices) of assigned pairs
+    """
+    n_pred, n_truth = score_matrix.shape
+
+    if (
+        n_pred * n_truth >= SPARSE_ASSIGNMENT_MIN_CELLS
+        and valid.mean() < SPARSE_ASSIGNMENT_MAX_DENSITY
+    ):
+        return _solve_assignment_sparse(score_matrix, valid)
+
+    # Negative score since we minimize
+    return linear_sum_assignment(-score_matrix)
+
+
+def _solve_assignment_sparse(
+    score_matrix: np.ndarray,
+    valid: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse max-score assignment over valid pairs only.
+
+    Each prediction also gets a private "unmatched" column so a full
+    matching always exists. Real edges cost (2 - score) and unmatched
+    edges cost 2, so minimizing total cost maximizes total score. All
+    costs are non-zero, which the CSR representation requires.
+    """
+    n_pred, n_truth = score_matrix.shape
+
+    rows, cols = np.nonzero(valid)
+    dummy = np.arange(n_pred)
+
+    data = np.concatenate([2.0 - score_matrix[rows, cols], np.full(n_pred, 2.0)])
+    biadjacency = csr_matrix(
+        (data, (np.concatenate([rows, dummy]), np.concatenate([cols, n_truth + dummy]))),
+        shape=(n_pred, n_truth + n_pred)
+    )
+
+    row_ind, col_ind = min_weight_full_bipartite_matching(biadjacency)
+
+    # Drop predictions that were parked on their unmatched column
+    real = col_ind < n_truth
+    return row_ind[real], col_ind[real]
+
+
 def _bounding_box_from_segments(segments: list[dict]) -> dict:
     """Calculate bounding box from list of segment coordinates."""
     if not segments:
@@ -294,7 +525,7 @@ def _bounding_box_from_segments(segments: list[dict]) -> dict:
 
 def score_extraction(
     predicted: list[dict],
-    ground_truth: list[dict],
+    ground_truth: GroundTruth,
     weights: Optional[dict] = None
 ) -> ExtractionScore:
     """
@@ -304,7 +535,7 @@ def score_extraction(
 
     Args:
         predicted: List of predicted field dicts
-        ground_truth: List of ground truth field dicts
+        ground_truth: Ground truth field dicts or a PreparedGroundTruth
         weights: Optional custom weights for overall score
 
     Returns:
@@ -319,11 +550,13 @@ def score_extraction(
             "label_accuracy": 0.15,
         }
 
+    truth = _as_prepared(ground_truth)
+
     # Match fields
-    matched, missed, extra = match_fields(predicted, ground_truth)
+    matched, missed, extra = match_fields(predicted, truth)
 
     # Detection metrics
-    n_truth = len(ground_truth)
+    n_truth = len(truth)
     n_pred = len(predicted)
     n_matched = len(matched)
 
@@ -362,9 +595,9 @@ def score_extraction(
     label_accuracy = (sum(label_sims) / len(label_sims) * 100) if label_sims else 0
 
     # Table-specific metrics
-    truth_tables = [f for f in ground_truth if f.get("fieldType") == "table"]
+    n_truth_tables = int(truth.is_table.sum())
     pred_tables = [f for f in predicted if f.get("fieldType") == "table"]
-    table_detection = len(pred_tables) >= len(truth_tables) if truth_tables else True
+    table_detection = len(pred_tables) >= n_truth_tables if n_truth_tables else True
 
     # Table cell accuracy would require expanding tables and comparing cells
     # For now, we'll use IoU of matched table fields
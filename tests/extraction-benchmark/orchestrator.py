@@ -14,16 +14,23 @@ Total: 2 models × 2 thinking × 3 architectures × 4 prompts = 48 configuration
 """
 
 import asyncio
-import json
+import io
 import os
+import queue
 import sys
+import threading
 import time
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
+from statistics import mean
 from typing import Iterator
 
+import orjson
+from PIL import Image
+
 from core import (
     ExtractorConfig,
     run_extraction_test,
@@ -31,7 +38,13 @@ from core import (
     PromptStyle,
     Architecture,
 )
-from evaluation import score_extraction, ExtractionScore
+from evaluation import (
+    score_extraction,
+    prepare_ground_truth,
+    warm_iou_kernel,
+    ExtractionScore,
+    PreparedGroundTruth,
+)
 from tools.visualize_benchmark import render_fields_on_image
 from core.image_processor import pdf_page_to_image
 
@@ -39,6 +52,12 @@ from core.image_processor import pdf_page_to_image
 # Default parallelism - respects Gemini rate limits
 DEFAULT_PARALLEL_TESTS = 4
 
+# orjson options for result files (NumPy scalars/arrays serialize directly)
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+# Palette size for visualization PNGs
+VIS_PALETTE_COLORS = 64
+
 
 # Test matrix configuration
 MODELS = ["gemini-3-flash-preview", "gemini-3-pro-preview"]
@@ -87,15 +106,14 @@ def generate_test_matrix() -> Iterator[TestConfig]:
 
 def load_benchmark(benchmark_path: str) -> list[dict]:
     """Load ground truth benchmark."""
-    with open(benchmark_path) as f:
-        data = json.load(f)
+    data = orjson.loads(Path(benchmark_path).read_bytes())
     return data.get("fields", [])
 
 
 def run_single_test(
     config: TestConfig,
     pdf_path: str,
-    benchmark: list[dict],
+    benchmark: PreparedGroundTruth,
     page_number: int = 0
 ) -> TestResult:
     """
@@ -104,7 +122,7 @@ def run_single_test(
     Args:
         config: Test configuration
         pdf_path: Path to PDF file
-        benchmark: Ground truth fields
+        benchmark: Prepared ground truth fields
         page_number: Page to extract
 
     Returns:
@@ -156,32 +174,56 @@ def save_result(result: TestResult, output_dir: Path):
         "error": result.extraction.error,
     }
 
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
+    with open(output_file, "wb") as f:
+        f.write(orjson.dumps(data, option=JSON_DUMP_OPTIONS))
 
 
 def save_visualization(
     result: TestResult,
-    pdf_path: str,
-    output_dir: Path,
-    page_number: int = 0,
-    dpi: int = 150
+    base_image: Image.Image,
+    output_dir: Path
 ):
-    """Save visualization of extraction result."""
-    from PIL import Image
+    """
+    Save visualization of extraction result.
 
+    Args:
+        result: Test result to render
+        base_image: Rasterized page, shared across results (not modified)
+        output_dir: Directory for results
+    """
     vis_dir = output_dir / "visualizations"
     vis_dir.mkdir(parents=True, exist_ok=True)
 
-    # Load page image
-    image = pdf_page_to_image(pdf_path, page_number, dpi)
+    # Render fields (render_fields_on_image draws on a copy)
+    result_image = render_fields_on_image(base_image, result.extraction.fields)
 
-    # Render fields
-    result_image = render_fields_on_image(image, result.extraction.fields)
-
-    # Save
+    # Save as a palette PNG - overlays are a few box colors on a grayscale
+    # form, so 64 colors is plenty and encodes much faster than RGB24
     output_file = vis_dir / f"{result.config.name}.png"
-    result_image.save(output_file, "PNG")
+    result_image.convert("P", palette=Image.Palette.ADAPTIVE, colors=VIS_PALETTE_COLORS).save(
+        output_file, "PNG", optimize=False, compress_level=3
+    )
+
+
+def _writer_loop(writer_q: queue.Queue):
+    """
+    Run queued disk writes off the main thread.
+
+    Pops (kind, args) jobs until a None sentinel is received.
+    """
+    while True:
+        job = writer_q.get()
+        if job is None:
+            break
+
+        kind, args = job
+        try:
+            if kind == "result":
+                save_result(*args)
+            elif kind == "visualization":
+                save_visualization(*args)
+        except Exception as e:
+            print(f"  Failed to write {kind}: {e}")
 
 
 def generate_report(results: list[TestResult], output_dir: Path):
@@ -191,103 +233,107 @@ def generate_report(results: list[TestResult], output_dir: Path):
     # Sort by overall score
     sorted_results = sorted(results, key=lambda r: r.score.overall_score, reverse=True)
 
-    lines = [
-        "# Extraction Benchmark Report",
-        "",
-        f"Generated: {datetime.now().isoformat()}",
-        "",
-        "## Summary",
-        "",
-        f"Total configurations tested: {len(results)}",
-        "",
-        "### Top 5 Configurations",
-        "",
-        "| Rank | Configuration | Overall | Detection | IoU | Types | Labels |",
-        "|------|---------------|---------|-----------|-----|-------|--------|",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+
+    w(
+        "# Extraction Benchmark Report\n"
+        "\n"
+        f"Generated: {datetime.now().isoformat()}\n"
+        "\n"
+        "## Summary\n"
+        "\n"
+        f"Total configurations tested: {len(results)}\n"
+        "\n"
+        "### Top 5 Configurations\n"
+        "\n"
+        "| Rank | Configuration | Overall | Detection | IoU | Types | Labels |\n"
+        "|------|---------------|---------|-----------|-----|-------|--------|\n"
+    )
 
     for i, r in enumerate(sorted_results[:5], 1):
-        lines.append(
+        w(
             f"| {i} | {r.config.name} | {r.score.overall_score:.1f}% | "
             f"{r.score.detection_rate:.1f}% | {r.score.avg_iou:.1f}% | "
-            f"{r.score.type_accuracy:.1f}% | {r.score.label_accuracy:.1f}% |"
+            f"{r.score.type_accuracy:.1f}% | {r.score.label_accuracy:.1f}% |\n"
         )
 
-    lines.extend([
-        "",
-        "## All Results",
-        "",
-        "| Configuration | Overall | Detection | Precision | IoU | Types | Labels | Time |",
-        "|---------------|---------|-----------|-----------|-----|-------|--------|------|",
-    ])
+    w(
+        "\n"
+        "## All Results\n"
+        "\n"
+        "| Configuration | Overall | Detection | Precision | IoU | Types | Labels | Time |\n"
+        "|---------------|---------|-----------|-----------|-----|-------|--------|------|\n"
+    )
+
+    # Bucket scores per dimension while writing the full table
+    by_arch: defaultdict[str, list[float]] = defaultdict(list)
+    by_prompt: defaultdict[str, list[float]] = defaultdict(list)
+    by_thinking: defaultdict[str, list[float]] = defaultdict(list)
 
     for r in sorted_results:
-        lines.append(
+        w(
             f"| {r.config.name} | {r.score.overall_score:.1f}% | "
             f"{r.score.detection_rate:.1f}% | {r.score.precision_rate:.1f}% | "
             f"{r.score.avg_iou:.1f}% | {r.score.type_accuracy:.1f}% | "
-            f"{r.score.label_accuracy:.1f}% | {r.duration_ms:.0f}ms |"
+            f"{r.score.label_accuracy:.1f}% | {r.duration_ms:.0f}ms |\n"
         )
+        by_arch[r.config.architecture].append(r.score.overall_score)
+        by_prompt[r.config.prompt_style].append(r.score.overall_score)
+        by_thinking[r.config.thinking_level].append(r.score.overall_score)
 
     # Analysis by dimension
-    lines.extend([
-        "",
-        "## Analysis by Dimension",
-        "",
-        "### By Architecture",
-        "",
-    ])
+    w(
+        "\n"
+        "## Analysis by Dimension\n"
+        "\n"
+        "### By Architecture\n"
+        "\n"
+    )
 
     for arch in ARCHITECTURES:
-        arch_results = [r for r in sorted_results if r.config.architecture == arch]
-        if arch_results:
-            avg_score = sum(r.score.overall_score for r in arch_results) / len(arch_results)
-            lines.append(f"- **{arch}**: {avg_score:.1f}% average")
+        if arch in by_arch:
+            w(f"- **{arch}**: {mean(by_arch[arch]):.1f}% average\n")
 
-    lines.extend([
-        "",
-        "### By Prompt Style",
-        "",
-    ])
+    w(
+        "\n"
+        "### By Prompt Style\n"
+        "\n"
+    )
 
     for prompt in PROMPT_STYLES:
-        prompt_results = [r for r in sorted_results if r.config.prompt_style == prompt]
-        if prompt_results:
-            avg_score = sum(r.score.overall_score for r in prompt_results) / len(prompt_results)
-            lines.append(f"- **{prompt}**: {avg_score:.1f}% average")
+        if prompt in by_prompt:
+            w(f"- **{prompt}**: {mean(by_prompt[prompt]):.1f}% average\n")
 
-    lines.extend([
-        "",
-        "### By Thinking Level",
-        "",
-    ])
+    w(
+        "\n"
+        "### By Thinking Level\n"
+        "\n"
+    )
 
     for thinking in THINKING_LEVELS:
-        think_results = [r for r in sorted_results if r.config.thinking_level == thinking]
-        if think_results:
-            avg_score = sum(r.score.overall_score for r in think_results) / len(think_results)
-            lines.append(f"- **{thinking}**: {avg_score:.1f}% average")
+        if thinking in by_thinking:
+            w(f"- **{thinking}**: {mean(by_thinking[thinking]):.1f}% average\n")
 
     # Best configuration recommendation
     best = sorted_results[0] if sorted_results else None
     if best:
-        lines.extend([
-            "",
-            "## Recommendation",
-            "",
-            f"**Best Configuration: {best.config.name}**",
-            "",
-            f"- Overall Score: {best.score.overall_score:.1f}%",
-            f"- Detection Rate: {best.score.detection_rate:.1f}%",
-            f"- Precision: {best.score.precision_rate:.1f}%",
-            f"- Average IoU: {best.score.avg_iou:.1f}%",
-            f"- Type Accuracy: {best.score.type_accuracy:.1f}%",
-            f"- Label Accuracy: {best.score.label_accuracy:.1f}%",
-            f"- Extraction Time: {best.duration_ms:.0f}ms",
-        ])
-
-    with open(report_path, "w") as f:
-        f.write("\n".join(lines))
+        w(
+            "\n"
+            "## Recommendation\n"
+            "\n"
+            f"**Best Configuration: {best.config.name}**\n"
+            "\n"
+            f"- Overall Score: {best.score.overall_score:.1f}%\n"
+            f"- Detection Rate: {best.score.detection_rate:.1f}%\n"
+            f"- Precision: {best.score.precision_rate:.1f}%\n"
+            f"- Average IoU: {best.score.avg_iou:.1f}%\n"
+            f"- Type Accuracy: {best.score.type_accuracy:.1f}%\n"
+            f"- Label Accuracy: {best.score.label_accuracy:.1f}%\n"
+            f"- Extraction Time: {best.duration_ms:.0f}ms\n"
+        )
+
+    report_path.write_text(buf.getvalue())
 
     print(f"\nReport saved to: {report_path}")
 
@@ -314,9 +360,13 @@ def run_benchmark(
         parallel: Number of tests to run in parallel (default 4)
     """
     print(f"Loading benchmark from: {benchmark_path}")
-    benchmark = load_benchmark(benchmark_path)
+    # Resolve ground truth once; worker threads share it for every config
+    benchmark = prepare_ground_truth(load_benchmark(benchmark_path))
     print(f"Benchmark has {len(benchmark)} fields")
 
+    # Compile the IoU kernel before workers start scoring
+    warm_iou_kernel()
+
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
@@ -326,6 +376,9 @@ def run_benchmark(
     if max_tests:
         test_configs = test_configs[:max_tests]
 
+    # Rasterize the page once for all visualizations
+    base_image = pdf_page_to_image(pdf_path, page_number) if visualize else None
+
     print(f"\nRunning {len(test_configs)} test configurations with {parallel} parallel workers...")
 
     def run_test_wrapper(config: TestConfig) -> tuple[TestConfig, TestResult | None, str | None]:
@@ -336,6 +389,12 @@ def run_benchmark(
         except Exception as e:
             return (config, None, str(e))
 
+    # Results and visualizations are written by a background thread so the
+    # loop below can pick up the next completed test immediately
+    writer_q: queue.Queue = queue.Queue()
+    writer = threading.Thread(target=_writer_loop, args=(writer_q,), daemon=True)
+    writer.start()
+
     completed = 0
     with ThreadPoolExecutor(max_workers=parallel) as executor:
         # Submit all tests
@@ -355,17 +414,21 @@ def run_benchmark(
                 results.append(result)
 
                 # Save result
-                save_result(result, output_path)
+                writer_q.put(("result", (result, output_path)))
 
                 # Generate visualization
                 if visualize:
-                    save_visualization(result, pdf_path, output_path, page_number)
+                    writer_q.put(("visualization", (result, base_image, output_path)))
 
                 print(f"[{completed}/{len(test_configs)}] {config.name}: "
                       f"{result.score.overall_score:.1f}% "
                       f"(Det: {result.score.detection_rate:.0f}%, "
                       f"IoU: {result.score.avg_iou:.0f}%)")
 
+    # Wait for queued writes to finish
+    writer_q.put(None)
+    writer.join()
+
     # Generate report
     if results:
         generate_report(results, output_path)
@@ -388,8 +451,8 @@ def run_benchmark(
             for r in results
         ]
 
-        with open(scores_dir / "all_scores.json", "w") as f:
-            json.dump(all_scores, f, indent=2)
+        with open(scores_dir / "all_scores.json", "wb") as f:
+            f.write(orjson.dumps(all_scores, option=JSON_DUMP_OPTIONS))
 
     print(f"\nBenchmark complete! Results saved to: {output_dir}")
 
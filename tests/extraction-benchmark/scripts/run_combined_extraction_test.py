@@ -9,69 +9,81 @@ Compares:
 Measures: detection, IoU, speed
 """
 
-import json
+import argparse
 import sys
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
+
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.gemini_client import GeminiClient, GeminiConfig
-from core.image_processor import resize_for_gemini, pdf_page_to_image
+from core.benchmark_loader import load_benchmark
+from core import image_cache, llm_cache
+from core.gemini_client import GeminiConfig
 from configs.prompts.extraction_with_questions import build_extraction_with_questions_prompt
 from configs.prompts.full_rails import build_full_rails_prompt
 from configs.prompts.high_agency import build_high_agency_prompt
-from evaluation.scorer import score_extraction
+
+
+@dataclass(frozen=True, slots=True)
+class TestConfig:
+    """A model/thinking/prompt combination to test."""
+    name: str
+    model: str
+    thinking_level: str
+    prompt_builder: Callable[[], str]
+    baseline_iou: float
+    baseline_detection: float
 
 
 # Top 3 configs by IoU with >90% detection
-CONFIGS_TO_TEST = [
-    {
-        "name": "flash_minimal_full_rails",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "minimal",
-        "prompt_builder": build_full_rails_prompt,
-        "baseline_iou": 69.4,
-        "baseline_detection": 94.1,
-    },
-    {
-        "name": "flash_low_full_rails",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "low",
-        "prompt_builder": build_full_rails_prompt,
-        "baseline_iou": 66.8,
-        "baseline_detection": 94.1,
-    },
-    {
-        "name": "flash_medium_high_agency",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "medium",
-        "prompt_builder": build_high_agency_prompt,
-        "baseline_iou": 60.9,
-        "baseline_detection": 100.0,
-    },
+CONFIGS_TO_TEST: list[TestConfig] = [
+    TestConfig(
+        name="flash_minimal_full_rails",
+        model="gemini-3-flash-preview",
+        thinking_level="minimal",
+        prompt_builder=build_full_rails_prompt,
+        baseline_iou=69.4,
+        baseline_detection=94.1,
+    ),
+    TestConfig(
+        name="flash_low_full_rails",
+        model="gemini-3-flash-preview",
+        thinking_level="low",
+        prompt_builder=build_full_rails_prompt,
+        baseline_iou=66.8,
+        baseline_detection=94.1,
+    ),
+    TestConfig(
+        name="flash_medium_high_agency",
+        model="gemini-3-flash-preview",
+        thinking_level="medium",
+        prompt_builder=build_high_agency_prompt,
+        baseline_iou=60.9,
+        baseline_detection=100.0,
+    ),
 ]
 
+# Default number of concurrent Gemini calls (stays under per-minute quotas)
+DEFAULT_PARALLEL = 4
 
-def load_benchmark() -> list[dict]:
-    """Load ground truth benchmark."""
-    with open("benchmark/prep_questionnaire_page1.json") as f:
-        data = json.load(f)
-    return data["fields"]
 
-
-def run_extraction_only(config: dict, image_base64: str) -> dict:
+def run_extraction_only(config: TestConfig, image_base64: str) -> dict:
     """Run extraction-only call (baseline)."""
-    client = GeminiClient(GeminiConfig(
-        model=config["model"],
-        thinking_level=config["thinking_level"],
-    ))
-
-    prompt = config["prompt_builder"]()
-
-    start_time = time.perf_counter()
-    result = client.extract_fields(image_base64, prompt)
-    duration_ms = (time.perf_counter() - start_time) * 1000
+    prompt = config.prompt_builder()
+
+    result = llm_cache.cached_extract_fields(
+        GeminiConfig(
+            model=config.model,
+            thinking_level=config.thinking_level,
+        ),
+        image_base64,
+        prompt,
+    )
+    duration_ms = result.duration_ms
 
     return {
         "fields": result.fields,
@@ -79,18 +91,19 @@ def run_extraction_only(config: dict, image_base64: str) -> dict:
     }
 
 
-def run_extraction_with_questions(config: dict, image_base64: str) -> dict:
+def run_extraction_with_questions(config: TestConfig, image_base64: str) -> dict:
     """Run combined extraction + questions call."""
-    client = GeminiClient(GeminiConfig(
-        model=config["model"],
-        thinking_level=config["thinking_level"],
-    ))
-
     prompt = build_extraction_with_questions_prompt()
 
-    start_time = time.perf_counter()
-    result = client.extract_fields(image_base64, prompt)
-    duration_ms = (time.perf_counter() - start_time) * 1000
+    result = llm_cache.cached_extract_fields(
+        GeminiConfig(
+            model=config.model,
+            thinking_level=config.thinking_level,
+        ),
+        image_base64,
+        prompt,
+    )
+    duration_ms = result.duration_ms
 
     # Check if questions were generated
     questions_generated = sum(1 for f in result.fields if f.get("question"))
@@ -102,7 +115,31 @@ def run_extraction_with_questions(config: dict, image_base64: str) -> dict:
     }
 
 
+def call_key(config: TestConfig, kind: str) -> tuple:
+    """Identify the Gemini call a config makes, so identical calls run once."""
+    if kind == "extract":
+        prompt_builder = config.prompt_builder
+    else:
+        prompt_builder = build_extraction_with_questions_prompt
+    return (config.model, config.thinking_level, prompt_builder)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Run combined extraction + questions test")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL,
+                        help=f"Number of concurrent Gemini calls (default {DEFAULT_PARALLEL})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call Gemini; skip reading/writing the response cache")
+    args = parser.parse_args()
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    if args.no_cache:
+        llm_cache.disable()
+
+    # Deferred so --help doesn't load scipy/Levenshtein
+    from evaluation.scorer import score_extraction
+
     print("=" * 70)
     print("COMBINED EXTRACTION + QUESTIONS TEST")
     print("=" * 70)
@@ -116,54 +153,86 @@ def main():
 
     # Load and resize page image
     pdf_path = "/Users/allisterhercus/Documents/Labs/smart-form/docs/tests/Prep Questionnaire 2025.pdf"
-    page_image = pdf_page_to_image(pdf_path, page_number=0)
-    processed = resize_for_gemini(page_image)
+    processed = image_cache.get_or_render(pdf_path, page_number=0)
     image_base64 = processed.image_base64
     print(f"Image: {processed.width}x{processed.height}")
     print()
 
-    results = []
+    # Extraction-only and extraction+questions calls are independent, so
+    # issue them concurrently (up to --parallel) and score once they are back
+    calls = [
+        (run_extraction_only, "extract"),
+        (run_extraction_with_questions, "combined"),
+    ]
 
+    # Configs that differ only in fields that don't reach Gemini (e.g.
+    # baselines) make the same call; submit it once and share the result
+    unique_calls: dict[tuple, tuple] = {}
     for config in CONFIGS_TO_TEST:
-        print(f"Testing: {config['name']}")
-        print("-" * 50)
+        for fn, kind in calls:
+            unique_calls.setdefault(call_key(config, kind), (fn, config))
+    total_calls = len(CONFIGS_TO_TEST) * len(calls)
+    print(f"Running {len(unique_calls)} Gemini calls "
+          f"({total_calls - len(unique_calls)} duplicates skipped), {args.parallel} at a time...")
+    print()
+
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        futures: dict[tuple, Future] = {
+            key: executor.submit(fn, config, image_base64)
+            for key, (fn, config) in unique_calls.items()
+        }
+
+    call_results: dict[tuple[str, str], dict] = {
+        (config.name, kind): futures[call_key(config, kind)].result()
+        for config in CONFIGS_TO_TEST
+        for _, kind in calls
+    }
+
+    results = []
 
-        # Run extraction only
-        print("  Running extraction-only...")
-        extract_result = run_extraction_only(config, image_base64)
+    for config in CONFIGS_TO_TEST:
+        # One write per config instead of a print per line
+        lines = []
+        lines.append(f"Testing: {config.name}")
+        lines.append("-" * 50)
+
+        # Extraction only
+        lines.append("  Extraction-only:")
+        extract_result = call_results[(config.name, "extract")]
         extract_scores = score_extraction(extract_result["fields"], benchmark)
 
-        print(f"    Fields: {len(extract_result['fields'])}")
-        print(f"    Time: {extract_result['duration_ms']:.0f}ms")
-        print(f"    Detection: {extract_scores.detection_rate:.1f}%")
-        print(f"    IoU: {extract_scores.avg_iou:.1f}%")
+        lines.append(f"    Fields: {len(extract_result['fields'])}")
+        lines.append(f"    Time: {extract_result['duration_ms']:.0f}ms")
+        lines.append(f"    Detection: {extract_scores.detection_rate:.1f}%")
+        lines.append(f"    IoU: {extract_scores.avg_iou:.1f}%")
 
-        # Run extraction + questions
-        print("  Running extraction+questions...")
-        combined_result = run_extraction_with_questions(config, image_base64)
+        # Extraction + questions
+        lines.append("  Extraction+questions:")
+        combined_result = call_results[(config.name, "combined")]
         combined_scores = score_extraction(combined_result["fields"], benchmark)
 
-        print(f"    Fields: {len(combined_result['fields'])}")
-        print(f"    Questions: {combined_result['questions_generated']}")
-        print(f"    Time: {combined_result['duration_ms']:.0f}ms")
-        print(f"    Detection: {combined_scores.detection_rate:.1f}%")
-        print(f"    IoU: {combined_scores.avg_iou:.1f}%")
+        lines.append(f"    Fields: {len(combined_result['fields'])}")
+        lines.append(f"    Questions: {combined_result['questions_generated']}")
+        lines.append(f"    Time: {combined_result['duration_ms']:.0f}ms")
+        lines.append(f"    Detection: {combined_scores.detection_rate:.1f}%")
+        lines.append(f"    IoU: {combined_scores.avg_iou:.1f}%")
 
         # Calculate deltas
         time_delta = combined_result["duration_ms"] - extract_result["duration_ms"]
         iou_delta = combined_scores.avg_iou - extract_scores.avg_iou
         detection_delta = combined_scores.detection_rate - extract_scores.detection_rate
 
-        print(f"  Delta:")
-        print(f"    Time: {time_delta:+.0f}ms ({time_delta/extract_result['duration_ms']*100:+.1f}%)")
-        print(f"    IoU: {iou_delta:+.1f}%")
-        print(f"    Detection: {detection_delta:+.1f}%")
-        print()
+        lines.append(f"  Delta:")
+        lines.append(f"    Time: {time_delta:+.0f}ms ({time_delta/extract_result['duration_ms']*100:+.1f}%)")
+        lines.append(f"    IoU: {iou_delta:+.1f}%")
+        lines.append(f"    Detection: {detection_delta:+.1f}%")
+        lines.append("")
+        print("\n".join(lines))
 
         results.append({
-            "config": config["name"],
-            "model": config["model"],
-            "thinking_level": config["thinking_level"],
+            "config": config.name,
+            "model": config.model,
+            "thinking_level": config.thinking_level,
             "extraction_only": {
                 "fields": len(extract_result["fields"]),
                 "duration_ms": extract_result["duration_ms"],
@@ -185,14 +254,19 @@ def main():
                 "iou": iou_delta,
                 "detection": detection_delta,
             },
+            # Kept in memory for the sample questions below, not saved
+            "sample_fields": combined_result["fields"],
         })
 
     # Save results
     output_dir = Path("results/combined_extraction")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(output_dir / "results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    with open(output_dir / "results.json", "wb") as f:
+        f.write(orjson.dumps(
+            [{k: v for k, v in r.items() if k != "sample_fields"} for r in results],
+            option=orjson.OPT_INDENT_2,
+        ))
 
     # Print summary
     print("=" * 70)
@@ -217,11 +291,7 @@ def main():
     print()
     print(f"Sample questions from {best['config']}:")
 
-    # Re-run to get the fields with questions (or load from saved result)
-    sample_config = next(c for c in CONFIGS_TO_TEST if c["name"] == best["config"])
-    sample_result = run_extraction_with_questions(sample_config, image_base64)
-
-    for field in sample_result["fields"][:5]:
+    for field in best["sample_fields"][:5]:
         if field.get("question"):
             print(f"  • {field['label']}: \"{field['question']}\"")
 
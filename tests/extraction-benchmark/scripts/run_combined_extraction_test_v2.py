@@ -6,73 +6,105 @@ Uses the same FieldExtractor infrastructure as the original benchmark
 to ensure fair comparison.
 """
 
-import json
+import argparse
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 
+import orjson
+from PIL import Image
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.field_extractor import FieldExtractor, ExtractorConfig, run_extraction_test
-from core.gemini_client import GeminiClient, GeminiConfig
-from core.image_processor import resize_for_gemini, pdf_page_to_image
+from core.benchmark_loader import load_benchmark
+from core.field_extractor import (
+    ExtractorConfig, Architecture, PromptStyle,
+)
+from core import image_cache, llm_cache
+from core.gemini_client import GeminiConfig
 from configs.prompts.extraction_with_questions import build_extraction_with_questions_prompt
-from evaluation.scorer import score_extraction
+
+
+@dataclass(frozen=True, slots=True)
+class TestConfig:
+    """A benchmark config to re-run with and without questions."""
+    name: str
+    model: str
+    thinking_level: str
+    architecture: Architecture
+    prompt_style: PromptStyle
+    baseline_iou: float
+    baseline_detection: float
 
 
 # Top 3 configs by IoU with >90% detection (from original benchmark)
-CONFIGS_TO_TEST = [
-    {
-        "name": "flash_minimal_single_page_full_rails",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "minimal",
-        "architecture": "single_page",
-        "prompt_style": "full_rails",
-        "baseline_iou": 69.4,
-        "baseline_detection": 94.1,
-    },
-    {
-        "name": "flash_low_single_page_full_rails",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "low",
-        "architecture": "single_page",
-        "prompt_style": "full_rails",
-        "baseline_iou": 66.8,
-        "baseline_detection": 94.1,
-    },
-    {
-        "name": "flash_medium_single_page_high_agency",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "medium",
-        "architecture": "single_page",
-        "prompt_style": "high_agency",
-        "baseline_iou": 60.9,
-        "baseline_detection": 100.0,
-    },
+CONFIGS_TO_TEST: list[TestConfig] = [
+    TestConfig(
+        name="flash_minimal_single_page_full_rails",
+        model="gemini-3-flash-preview",
+        thinking_level="minimal",
+        architecture="single_page",
+        prompt_style="full_rails",
+        baseline_iou=69.4,
+        baseline_detection=94.1,
+    ),
+    TestConfig(
+        name="flash_low_single_page_full_rails",
+        model="gemini-3-flash-preview",
+        thinking_level="low",
+        architecture="single_page",
+        prompt_style="full_rails",
+        baseline_iou=66.8,
+        baseline_detection=94.1,
+    ),
+    TestConfig(
+        name="flash_medium_single_page_high_agency",
+        model="gemini-3-flash-preview",
+        thinking_level="medium",
+        architecture="single_page",
+        prompt_style="high_agency",
+        baseline_iou=60.9,
+        baseline_detection=100.0,
+    ),
 ]
 
+# Default number of concurrent Gemini calls (stays under per-minute quotas)
+DEFAULT_PARALLEL = 4
+
 PDF_PATH = "/Users/allisterhercus/Documents/Labs/smart-form/docs/tests/Prep Questionnaire 2025.pdf"
 
 
-def load_benchmark() -> list[dict]:
-    """Load ground truth benchmark."""
-    with open("benchmark/prep_questionnaire_page1.json") as f:
-        data = json.load(f)
-    return data["fields"]
+def run_extraction_only(config: TestConfig, page_image: Image.Image) -> dict:
+    """Run extraction only using FieldExtractor (same as benchmark)."""
+    extractor_config = ExtractorConfig(
+        model=config.model,
+        thinking_level=config.thinking_level,
+        architecture=config.architecture,
+        prompt_style=config.prompt_style,
+    )
 
+    extract_result = llm_cache.cached_extraction_test(PDF_PATH, extractor_config, 0, page_image)
 
-def run_extraction_with_questions(config: dict, image_base64: str) -> dict:
-    """Run combined extraction + questions call."""
-    client = GeminiClient(GeminiConfig(
-        model=config["model"],
-        thinking_level=config["thinking_level"],
-    ))
+    return {
+        "result": extract_result,
+        "duration_ms": extract_result.total_duration_ms,
+    }
 
+
+def run_extraction_with_questions(config: TestConfig, image_base64: str) -> dict:
+    """Run combined extraction + questions call."""
     prompt = build_extraction_with_questions_prompt()
 
-    start_time = time.perf_counter()
-    result = client.extract_fields(image_base64, prompt)
-    duration_ms = (time.perf_counter() - start_time) * 1000
+    result = llm_cache.cached_extract_fields(
+        GeminiConfig(
+            model=config.model,
+            thinking_level=config.thinking_level,
+        ),
+        image_base64,
+        prompt,
+    )
+    duration_ms = result.duration_ms
 
     # Check if questions were generated
     questions_generated = sum(1 for f in result.fields if f.get("question"))
@@ -85,6 +117,21 @@ def run_extraction_with_questions(config: dict, image_base64: str) -> dict:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run combined extraction + questions test (v2)")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL,
+                        help=f"Number of concurrent Gemini calls (default {DEFAULT_PARALLEL})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call Gemini; skip reading/writing the response cache")
+    args = parser.parse_args()
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    if args.no_cache:
+        llm_cache.disable()
+
+    # Deferred so --help doesn't load scipy/Levenshtein
+    from evaluation.scorer import score_extraction
+
     print("=" * 70)
     print("COMBINED EXTRACTION + QUESTIONS TEST (v2)")
     print("=" * 70)
@@ -97,69 +144,87 @@ def main():
     print(f"Benchmark: {len(benchmark)} fields")
     print()
 
-    # Prepare image for combined test
-    page_image = pdf_page_to_image(PDF_PATH, page_number=0)
-    processed = resize_for_gemini(page_image)
-    image_base64 = processed.image_base64
+    # Rasterize once; every extraction-only run reuses the full page and
+    # every combined call the Gemini-ready image
+    page = image_cache.get_page_bundle(PDF_PATH)
+    image_base64 = page.image_base64
+
+    # Both calls for every config are independent; run them concurrently
+    # (up to --parallel) and score once they are back
+    print(f"Running {len(CONFIGS_TO_TEST) * 2} Gemini calls, {args.parallel} at a time...")
+    print()
+
+    call_results: dict[tuple[str, str], dict] = {}
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        futures = {}
+        for config in CONFIGS_TO_TEST:
+            futures[executor.submit(run_extraction_only, config, page.pil)] = (config.name, "extract")
+            futures[executor.submit(run_extraction_with_questions, config, image_base64)] = (
+                config.name, "combined"
+            )
+        for future in as_completed(futures):
+            call_results[futures[future]] = future.result()
 
     results = []
 
     for config in CONFIGS_TO_TEST:
-        print(f"Testing: {config['name']}")
-        print("-" * 50)
-
-        # Run extraction only using FieldExtractor (same as benchmark)
-        print("  Running extraction-only (via FieldExtractor)...")
-        extractor_config = ExtractorConfig(
-            model=config["model"],
-            thinking_level=config["thinking_level"],
-            architecture=config["architecture"],
-            prompt_style=config["prompt_style"],
-        )
-
-        start_time = time.perf_counter()
-        extract_result = run_extraction_test(PDF_PATH, extractor_config, page_number=0)
-        extract_duration = (time.perf_counter() - start_time) * 1000
+        # One write per config instead of a print per line
+        lines = []
+        lines.append(f"Testing: {config.name}")
+        lines.append("-" * 50)
 
-        extract_scores = score_extraction(extract_result.fields, benchmark)
+        # Extraction only via FieldExtractor (same as benchmark)
+        lines.append("  Extraction-only (via FieldExtractor):")
+        extract_result = call_results[(config.name, "extract")]["result"]
+        extract_duration = call_results[(config.name, "extract")]["duration_ms"]
 
-        print(f"    Fields: {len(extract_result.fields)}")
-        print(f"    Time: {extract_duration:.0f}ms")
-        print(f"    Detection: {extract_scores.detection_rate:.1f}%")
-        print(f"    IoU: {extract_scores.avg_iou:.1f}%")
-        print(f"    (Baseline was: {config['baseline_iou']}% IoU, {config['baseline_detection']}% detection)")
+        extract_scores = score_extraction(extract_result.fields, benchmark)
 
-        # Run extraction + questions
-        print("  Running extraction+questions...")
-        combined_result = run_extraction_with_questions(config, image_base64)
+        lines.append(f"    Fields: {len(extract_result.fields)}")
+        if extract_result.error:
+            lines.append(f"    Error: {extract_result.error}")
+        lines.append(f"    Time: {extract_duration:.0f}ms")
+        lines.append(f"    Detection: {extract_scores.detection_rate:.1f}%")
+        lines.append(f"    IoU: {extract_scores.avg_iou:.1f}%")
+        lines.append(f"    (Baseline was: {config.baseline_iou}% IoU, {config.baseline_detection}% detection)")
+
+        # Extraction + questions
+        lines.append("  Extraction+questions:")
+        combined_result = call_results[(config.name, "combined")]
         combined_scores = score_extraction(combined_result["fields"], benchmark)
 
-        print(f"    Fields: {len(combined_result['fields'])}")
-        print(f"    Questions: {combined_result['questions_generated']}")
-        print(f"    Time: {combined_result['duration_ms']:.0f}ms")
-        print(f"    Detection: {combined_scores.detection_rate:.1f}%")
-        print(f"    IoU: {combined_scores.avg_iou:.1f}%")
+        lines.append(f"    Fields: {len(combined_result['fields'])}")
+        lines.append(f"    Questions: {combined_result['questions_generated']}")
+        lines.append(f"    Time: {combined_result['duration_ms']:.0f}ms")
+        lines.append(f"    Detection: {combined_scores.detection_rate:.1f}%")
+        lines.append(f"    IoU: {combined_scores.avg_iou:.1f}%")
 
         # Calculate deltas
         time_delta = combined_result["duration_ms"] - extract_duration
         iou_delta = combined_scores.avg_iou - extract_scores.avg_iou
         detection_delta = combined_scores.detection_rate - extract_scores.detection_rate
 
-        print(f"  Delta vs this run:")
-        print(f"    Time: {time_delta:+.0f}ms ({time_delta/extract_duration*100:+.1f}%)")
-        print(f"    IoU: {iou_delta:+.1f}%")
-        print(f"    Detection: {detection_delta:+.1f}%")
-        print()
+        lines.append(f"  Delta vs this run:")
+        if extract_result.error or extract_duration == 0:
+            # A failed extraction has no duration to compare against
+            lines.append("    Time: n/a")
+        else:
+            lines.append(f"    Time: {time_delta:+.0f}ms ({time_delta/extract_duration*100:+.1f}%)")
+        lines.append(f"    IoU: {iou_delta:+.1f}%")
+        lines.append(f"    Detection: {detection_delta:+.1f}%")
+        lines.append("")
+        print("\n".join(lines))
 
         results.append({
-            "config": config["name"],
+            "config": config.name,
             "baseline": {
-                "iou": config["baseline_iou"],
-                "detection": config["baseline_detection"],
+                "iou": config.baseline_iou,
+                "detection": config.baseline_detection,
             },
             "extraction_only": {
                 "fields": len(extract_result.fields),
                 "duration_ms": extract_duration,
+                "error": extract_result.error,
                 "detection": extract_scores.detection_rate,
                 "iou": extract_scores.avg_iou,
                 "types": extract_scores.type_accuracy,
@@ -178,8 +243,8 @@ def main():
     output_dir = Path("results/combined_extraction")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(output_dir / "results_v2.json", "w") as f:
-        json.dump(results, f, indent=2)
+    with open(output_dir / "results_v2.json", "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
 
     # Print summary
     print("=" * 70)
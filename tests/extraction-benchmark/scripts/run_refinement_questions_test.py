@@ -8,58 +8,71 @@ Tests whether a second pass can improve field coordinates
 while also generating questions.
 """
 
-import json
+import argparse
+import asyncio
 import sys
 import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Awaitable
+
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.field_extractor import ExtractorConfig, run_extraction_test
-from core.gemini_client import GeminiClient, GeminiConfig
-from core.image_processor import resize_for_gemini, pdf_page_to_image
+from core.benchmark_loader import load_benchmark
+from core.field_extractor import ExtractorConfig, Architecture, PromptStyle
+from core import image_cache, llm_cache
+from core.gemini_client import GeminiConfig
 from configs.prompts.refinement_with_questions import build_refinement_with_questions_prompt
-from evaluation.scorer import score_extraction
 
 PDF_PATH = "/Users/allisterhercus/Documents/Labs/smart-form/docs/tests/Prep Questionnaire 2025.pdf"
 
+@dataclass(frozen=True, slots=True)
+class TestConfig:
+    """A pass-1 extraction config to follow with a refinement pass."""
+    name: str
+    model: str
+    thinking_level: str
+    architecture: Architecture
+    prompt_style: PromptStyle
+    baseline_iou: float
+    baseline_detection: float
+
+
 # Top 3 IoU configs with >90% detection (2 have 100%, 1 has 94.1%)
-CONFIGS_TO_TEST = [
-    {
-        "name": "flash_minimal_single_page_high_agency",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "minimal",
-        "architecture": "single_page",
-        "prompt_style": "high_agency",
-        "baseline_iou": 67.0,
-        "baseline_detection": 100.0,
-    },
-    {
-        "name": "flash_medium_single_page_high_agency",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "medium",
-        "architecture": "single_page",
-        "prompt_style": "high_agency",
-        "baseline_iou": 60.9,  # from original tests
-        "baseline_detection": 100.0,
-    },
-    {
-        "name": "flash_medium_single_page_full_rails",
-        "model": "gemini-3-flash-preview",
-        "thinking_level": "medium",
-        "architecture": "single_page",
-        "prompt_style": "full_rails_no_rulers",  # Use the no-rulers version
-        "baseline_iou": 58.7,
-        "baseline_detection": 94.1,
-    },
+CONFIGS_TO_TEST: list[TestConfig] = [
+    TestConfig(
+        name="flash_minimal_single_page_high_agency",
+        model="gemini-3-flash-preview",
+        thinking_level="minimal",
+        architecture="single_page",
+        prompt_style="high_agency",
+        baseline_iou=67.0,
+        baseline_detection=100.0,
+    ),
+    TestConfig(
+        name="flash_medium_single_page_high_agency",
+        model="gemini-3-flash-preview",
+        thinking_level="medium",
+        architecture="single_page",
+        prompt_style="high_agency",
+        baseline_iou=60.9,  # from original tests
+        baseline_detection=100.0,
+    ),
+    TestConfig(
+        name="flash_medium_single_page_full_rails",
+        model="gemini-3-flash-preview",
+        thinking_level="medium",
+        architecture="single_page",
+        prompt_style="full_rails_no_rulers",  # Use the no-rulers version
+        baseline_iou=58.7,
+        baseline_detection=94.1,
+    ),
 ]
 
-
-def load_benchmark() -> list[dict]:
-    """Load ground truth benchmark."""
-    with open("benchmark/prep_questionnaire_page1.json") as f:
-        data = json.load(f)
-    return data["fields"]
+# Default number of concurrent Gemini calls (stays under per-minute quotas)
+DEFAULT_PARALLEL = 4
 
 
 def run_refinement_pass(initial_fields: list[dict], image_base64: str, thinking_level: str = "medium") -> dict:
@@ -74,16 +87,17 @@ def run_refinement_pass(initial_fields: list[dict], image_base64: str, thinking_
     Returns:
         Dict with refined fields, timing, and question count
     """
-    client = GeminiClient(GeminiConfig(
-        model="gemini-3-flash-preview",
-        thinking_level=thinking_level,
-    ))
-
     prompt = build_refinement_with_questions_prompt(initial_fields)
 
-    start_time = time.perf_counter()
-    result = client.extract_fields(image_base64, prompt)
-    duration_ms = (time.perf_counter() - start_time) * 1000
+    result = llm_cache.cached_extract_fields(
+        GeminiConfig(
+            model="gemini-3-flash-preview",
+            thinking_level=thinking_level,
+        ),
+        image_base64,
+        prompt,
+    )
+    duration_ms = result.duration_ms
 
     # Count questions generated
     questions_generated = sum(1 for f in result.fields if f.get("question"))
@@ -95,7 +109,93 @@ def run_refinement_pass(initial_fields: list[dict], image_base64: str, thinking_
     }
 
 
+async def timed(awaitable: Awaitable) -> tuple[Any, float]:
+    """Await something and return (result, elapsed ms)."""
+    start_time = time.perf_counter()
+    result = await awaitable
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+async def run_config(config: TestConfig, page: image_cache.PageBundle, semaphore: asyncio.Semaphore) -> dict:
+    """
+    Run both passes for one config.
+
+    Pass 2 depends on pass 1, but configs are independent, so each config
+    runs as its own pipeline alongside the others.
+
+    Args:
+        config: Entry from CONFIGS_TO_TEST
+        page: The form page (full resolution for pass 1, Gemini-ready
+            image for the refinement pass)
+        semaphore: Bounds concurrent Gemini calls across all pipelines
+
+    Returns:
+        Dict with pass 1 result, pass 1 duration (that of the original
+        run on a cache hit), pass 2 result and the pipeline's own elapsed
+        time (per_task_ms)
+    """
+    print(f"  Starting: {config.name}")
+
+    extractor_config = ExtractorConfig(
+        model=config.model,
+        thinking_level=config.thinking_level,
+        architecture=config.architecture,
+        prompt_style=config.prompt_style,
+    )
+
+    # Pass 1: Initial extraction
+    async with semaphore:
+        extract_result, extract_elapsed = await timed(asyncio.to_thread(
+            llm_cache.cached_extraction_test, PDF_PATH, extractor_config, 0, page.pil
+        ))
+
+    # Pass 2: Refinement + questions
+    async with semaphore:
+        refined_result, refine_duration = await timed(asyncio.to_thread(
+            run_refinement_pass,
+            extract_result.fields,
+            page.image_base64,
+            "medium"  # Use medium thinking for refinement reasoning
+        ))
+
+    return {
+        "extract_result": extract_result,
+        "extract_duration": extract_result.total_duration_ms,
+        "refined_result": refined_result,
+        "per_task_ms": extract_elapsed + refine_duration,
+    }
+
+
+async def run_all_configs(page: image_cache.PageBundle, parallel: int) -> tuple[list[dict], float]:
+    """
+    Run every config's two-pass pipeline concurrently, with at most
+    `parallel` Gemini calls in flight.
+
+    Returns:
+        (per-config runs, wall_time_ms for the whole gather)
+    """
+    semaphore = asyncio.Semaphore(parallel)
+    return await timed(asyncio.gather(*[
+        run_config(config, page, semaphore) for config in CONFIGS_TO_TEST
+    ]))
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Run two-pass refinement + questions test")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL,
+                        help=f"Number of concurrent Gemini calls (default {DEFAULT_PARALLEL})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call Gemini; skip reading/writing the response cache")
+    args = parser.parse_args()
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    if args.no_cache:
+        llm_cache.disable()
+
+    # Deferred so --help doesn't load scipy/Levenshtein
+    from evaluation.scorer import score_extraction
+
     print("=" * 70)
     print("TWO-PASS EXTRACTION TEST: REFINEMENT + QUESTIONS")
     print("=" * 70)
@@ -109,65 +209,59 @@ def main():
     print(f"Benchmark: {len(benchmark)} fields")
     print()
 
-    # Prepare image for refinement pass
-    page_image = pdf_page_to_image(PDF_PATH, page_number=0)
-    processed = resize_for_gemini(page_image)
-    image_base64 = processed.image_base64
+    # Rasterize once for both passes of every pipeline
+    page = image_cache.get_page_bundle(PDF_PATH)
+
+    print(f"Running {len(CONFIGS_TO_TEST)} two-pass pipelines in parallel...")
+    runs, wall_time_ms = asyncio.run(run_all_configs(page, args.parallel))
+    print()
 
     results = []
 
-    for config in CONFIGS_TO_TEST:
-        print(f"Testing: {config['name']}")
-        print("=" * 60)
+    for config, run in zip(CONFIGS_TO_TEST, runs):
+        # One write per config instead of a print per line
+        lines = []
+        lines.append(f"Testing: {config.name}")
+        lines.append("=" * 60)
 
         # Pass 1: Initial extraction
-        print("  PASS 1: Initial extraction...")
-        extractor_config = ExtractorConfig(
-            model=config["model"],
-            thinking_level=config["thinking_level"],
-            architecture=config["architecture"],
-            prompt_style=config["prompt_style"],
-        )
-
-        start_time = time.perf_counter()
-        extract_result = run_extraction_test(PDF_PATH, extractor_config, page_number=0)
-        extract_duration = (time.perf_counter() - start_time) * 1000
+        lines.append("  PASS 1: Initial extraction")
+        extract_result = run["extract_result"]
+        extract_duration = run["extract_duration"]
 
         extract_scores = score_extraction(extract_result.fields, benchmark)
 
-        print(f"    Fields: {len(extract_result.fields)}")
-        print(f"    Time: {extract_duration:.0f}ms")
-        print(f"    Detection: {extract_scores.detection_rate:.1f}%")
-        print(f"    IoU: {extract_scores.avg_iou:.1f}%")
+        lines.append(f"    Fields: {len(extract_result.fields)}")
+        lines.append(f"    Time: {extract_duration:.0f}ms")
+        lines.append(f"    Detection: {extract_scores.detection_rate:.1f}%")
+        lines.append(f"    IoU: {extract_scores.avg_iou:.1f}%")
 
         # Pass 2: Refinement + questions
-        print("  PASS 2: Refinement + questions...")
-        refined_result = run_refinement_pass(
-            extract_result.fields,
-            image_base64,
-            thinking_level="medium"  # Use medium thinking for refinement reasoning
-        )
+        lines.append("  PASS 2: Refinement + questions")
+        refined_result = run["refined_result"]
         refined_scores = score_extraction(refined_result["fields"], benchmark)
 
-        print(f"    Fields: {len(refined_result['fields'])}")
-        print(f"    Questions: {refined_result['questions_generated']}")
-        print(f"    Time: {refined_result['duration_ms']:.0f}ms")
-        print(f"    Detection: {refined_scores.detection_rate:.1f}%")
-        print(f"    IoU: {refined_scores.avg_iou:.1f}%")
+        lines.append(f"    Fields: {len(refined_result['fields'])}")
+        lines.append(f"    Questions: {refined_result['questions_generated']}")
+        lines.append(f"    Time: {refined_result['duration_ms']:.0f}ms")
+        lines.append(f"    Detection: {refined_scores.detection_rate:.1f}%")
+        lines.append(f"    IoU: {refined_scores.avg_iou:.1f}%")
 
         # Calculate deltas
         total_time = extract_duration + refined_result["duration_ms"]
         iou_delta = refined_scores.avg_iou - extract_scores.avg_iou
         detection_delta = refined_scores.detection_rate - extract_scores.detection_rate
 
-        print(f"  DELTA (after refinement):")
-        print(f"    IoU: {iou_delta:+.1f}%")
-        print(f"    Detection: {detection_delta:+.1f}%")
-        print(f"    Total time: {total_time:.0f}ms")
-        print()
+        lines.append(f"  DELTA (after refinement):")
+        lines.append(f"    IoU: {iou_delta:+.1f}%")
+        lines.append(f"    Detection: {detection_delta:+.1f}%")
+        lines.append(f"    Total time: {total_time:.0f}ms")
+        lines.append(f"    Pipeline wall time: {run['per_task_ms']:.0f}ms")
+        lines.append("")
+        print("\n".join(lines))
 
         results.append({
-            "config": config["name"],
+            "config": config.name,
             "pass1_extraction": {
                 "fields": len(extract_result.fields),
                 "duration_ms": extract_duration,
@@ -186,14 +280,20 @@ def main():
                 "detection": detection_delta,
             },
             "total_duration_ms": total_time,
+            "per_task_ms": run["per_task_ms"],
+            # Kept in memory for the sample questions below, not saved
+            "sample_fields": refined_result["fields"],
         })
 
     # Save results
     output_dir = Path("results/refinement_questions")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(output_dir / "results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    with open(output_dir / "results.json", "wb") as f:
+        f.write(orjson.dumps(
+            [{k: v for k, v in r.items() if k != "sample_fields"} for r in results],
+            option=orjson.OPT_INDENT_2,
+        ))
 
     # Print summary
     print("=" * 70)
@@ -210,6 +310,12 @@ def main():
               f"{r['delta']['iou']:>+7.1f}% "
               f"{r['pass2_refinement']['questions']:>4}")
 
+    # Pipelines overlap, so wall time is the real end-to-end cost
+    sequential_ms = sum(run["per_task_ms"] for run in runs)
+    print()
+    print(f"Wall time: {wall_time_ms:.0f}ms "
+          f"(sum of pipelines {sequential_ms:.0f}ms, {sequential_ms / wall_time_ms:.1f}x speedup)")
+
     print()
     print(f"Results saved to: {output_dir}/results.json")
 
@@ -218,18 +324,7 @@ def main():
     print()
     print(f"Sample questions from best result ({best['config']}):")
 
-    # Re-run to get the actual fields with questions
-    best_config = next(c for c in CONFIGS_TO_TEST if c["name"] == best["config"])
-    extractor_config = ExtractorConfig(
-        model=best_config["model"],
-        thinking_level=best_config["thinking_level"],
-        architecture=best_config["architecture"],
-        prompt_style=best_config["prompt_style"],
-    )
-    extract_result = run_extraction_test(PDF_PATH, extractor_config, page_number=0)
-    refined_result = run_refinement_pass(extract_result.fields, image_base64, "medium")
-
-    for field in refined_result["fields"][:5]:
+    for field in best["sample_fields"][:5]:
         if field.get("question"):
             print(f"  • {field['label']}: \"{field['question']}\"")
 
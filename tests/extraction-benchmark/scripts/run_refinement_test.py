@@ -5,34 +5,51 @@ Refinement test: Can Gemini fix Azure OCR output?
 Tests the top configs on their ability to refine/correct OCR-detected fields.
 """
 
+import argparse
+import asyncio
+import gc
 import json
+import os
 import sys
 import time
-import base64
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from dataclasses import asdict
+from dataclasses import dataclass
+
+import orjson
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.gemini_client import GeminiClient, GeminiConfig
-from core.image_processor import resize_for_gemini
+from core.benchmark_loader import load_benchmark
+from core import image_cache, llm_cache
+from core.atomic_io import write_atomic
+from core.image_cache import PageBundle
+from core.gemini_client import GeminiConfig
 from configs.prompts.refinement import build_refinement_prompt, build_refinement_prompt_minimal
-from evaluation.scorer import score_extraction
-from tools.visualize_benchmark import render_fields_on_image
-from pdf2image import convert_from_path
 from PIL import Image
 
 
+@dataclass(frozen=True, slots=True)
+class TestConfig:
+    """A Gemini model/thinking level to test."""
+    model: str
+    thinking_level: str
+    name: str
+
+
 # Configs to test
-CONFIGS_TO_TEST = [
-    {"model": "gemini-3-flash-preview", "thinking_level": "medium", "name": "flash_medium"},
-    {"model": "gemini-3-flash-preview", "thinking_level": "low", "name": "flash_low"},
-    {"model": "gemini-3-pro-preview", "thinking_level": "low", "name": "pro_low"},
+CONFIGS_TO_TEST: list[TestConfig] = [
+    TestConfig(model="gemini-3-flash-preview", thinking_level="medium", name="flash_medium"),
+    TestConfig(model="gemini-3-flash-preview", thinking_level="low", name="flash_low"),
+    TestConfig(model="gemini-3-pro-preview", thinking_level="low", name="pro_low"),
 ]
 
 PROMPT_VARIANTS = ["full", "minimal"]
 
+# Default number of concurrent Gemini calls (stays under per-minute quotas)
+DEFAULT_PARALLEL = 4
+
 
 def load_azure_draft() -> list[dict]:
     """Load the Azure OCR draft fields."""
@@ -41,37 +58,49 @@ def load_azure_draft() -> list[dict]:
     return data["fields"]
 
 
-def load_benchmark() -> list[dict]:
-    """Load ground truth benchmark."""
-    with open("benchmark/prep_questionnaire_page1.json") as f:
-        data = json.load(f)
-    return data["fields"]
-
+def save_visualization(page_image: Image.Image, fields: list[dict], output_path: Path) -> Path:
+    """Render fields onto the page and save as PNG."""
+    from tools.visualize_benchmark import render_fields_on_image
 
-def get_page_image_base64(pdf_path: str, dpi: int = 150) -> tuple[str, Image.Image]:
-    """Convert PDF page to base64 and return both base64 and PIL image."""
-    images = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
-    if not images:
-        raise ValueError("Could not convert PDF")
+    render_fields_on_image(page_image, fields).save(output_path)
+    return output_path
 
-    page_image = images[0]
 
-    # Resize for Gemini and get base64
-    processed = resize_for_gemini(page_image)
+def score_fields(fields: list[dict], benchmark: list[dict]) -> dict:
+    """Score fields against the benchmark (runs in a worker process)."""
+    from evaluation.scorer import score_extraction
 
-    return processed.image_base64, page_image
+    scores = score_extraction(fields, benchmark)
+    return {
+        "overall_score": scores.overall_score,
+        "detection_rate": scores.detection_rate,
+        "precision_rate": scores.precision_rate,
+        "avg_iou": scores.avg_iou,
+        "type_accuracy": scores.type_accuracy,
+        "label_accuracy": scores.label_accuracy,
+    }
 
 
-def run_refinement_test(
-    config: dict,
+async def run_refinement_test(
+    config: TestConfig,
     prompt_variant: str,
     ocr_fields: list[dict],
-    image_base64: str,
+    page: PageBundle,
     benchmark: list[dict],
+    output_dir: Path,
+    score_pool: Executor,
+    force: bool = False,
 ) -> dict:
-    """Run a single refinement test."""
-    config_name = f"{config['name']}_{prompt_variant}"
-    print(f"  Running: {config_name}...")
+    """
+    Run a single refinement test and save its JSON as soon as it finishes.
+
+    A previously saved result without an error is reused unless force is set,
+    so an interrupted run picks up where it stopped. Results are tagged with
+    the Gemini call's llm_cache key, so one saved for a different model,
+    prompt, image or PROMPT_VERSION is re-run rather than reused.
+    """
+    config_name = f"{config.name}_{prompt_variant}"
+    output_path = output_dir / f"{config_name}.json"
 
     # Build prompt
     if prompt_variant == "minimal":
@@ -79,35 +108,70 @@ def run_refinement_test(
     else:
         prompt = build_refinement_prompt(ocr_fields)
 
-    # Create client
-    client = GeminiClient(GeminiConfig(
-        model=config["model"],
-        thinking_level=config["thinking_level"],
-    ))
+    cache_key = llm_cache.make_key(config.model, config.thinking_level, prompt, page.image_base64)
+
+    if not force:
+        try:
+            with open(output_path) as f:
+                saved = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Not saved yet (or cut short by a run from before atomic writes)
+            saved = None
+        if saved is not None and not saved["error"] and saved.get("cache_key") == cache_key:
+            print(f"  Skipping: {config_name} (already in {output_path})")
+            return saved
+
+    print(f"  Running: {config_name}...")
+    result = await _run_refinement_test(
+        config, prompt_variant, config_name, prompt, page.image_base64, benchmark,
+        score_pool,
+    )
+    result["cache_key"] = cache_key
+
+    # Atomic so an interrupted run never leaves a partial file to resume from
+    write_atomic(output_path, orjson.dumps(result, option=orjson.OPT_INDENT_2))
+
+    return result
+
+
+async def _run_refinement_test(
+    config: TestConfig,
+    prompt_variant: str,
+    config_name: str,
+    prompt: str,
+    image_base64: str,
+    benchmark: list[dict],
+    score_pool: Executor,
+) -> dict:
+    """Call Gemini and score the response for one config x prompt variant."""
+    gemini_config = GeminiConfig(
+        model=config.model,
+        thinking_level=config.thinking_level,
+    )
 
     start_time = time.perf_counter()
 
     try:
-        result = client.extract_fields(image_base64, prompt)
-        duration_ms = (time.perf_counter() - start_time) * 1000
-
-        # Score the result
-        scores = score_extraction(result.fields, benchmark)
+        # Gemini client is sync; run it in a thread so tests overlap
+        result = await asyncio.to_thread(
+            llm_cache.cached_extract_fields,
+            gemini_config, image_base64, prompt, {"config": config_name},
+        )
+        duration_ms = result.duration_ms
+
+        # Score the result on the process pool so scoring of finished
+        # tests overlaps across cores instead of sharing the event loop
+        scores = await asyncio.get_running_loop().run_in_executor(
+            score_pool, score_fields, result.fields, benchmark
+        )
 
         return {
             "config": config_name,
-            "model": config["model"],
-            "thinking_level": config["thinking_level"],
+            "model": config.model,
+            "thinking_level": config.thinking_level,
             "prompt_variant": prompt_variant,
             "fields": result.fields,
-            "score": {
-                "overall_score": scores.overall_score,
-                "detection_rate": scores.detection_rate,
-                "precision_rate": scores.precision_rate,
-                "avg_iou": scores.avg_iou,
-                "type_accuracy": scores.type_accuracy,
-                "label_accuracy": scores.label_accuracy,
-            },
+            "score": scores,
             "duration_ms": duration_ms,
             "error": None,
             "refinement_notes": result.raw_response.get("refinement_notes", ""),
@@ -117,8 +181,8 @@ def run_refinement_test(
         duration_ms = (time.perf_counter() - start_time) * 1000
         return {
             "config": config_name,
-            "model": config["model"],
-            "thinking_level": config["thinking_level"],
+            "model": config.model,
+            "thinking_level": config.thinking_level,
             "prompt_variant": prompt_variant,
             "fields": [],
             "score": None,
@@ -127,7 +191,65 @@ def run_refinement_test(
         }
 
 
+async def run_all_tests(
+    ocr_fields: list[dict],
+    page: PageBundle,
+    benchmark: list[dict],
+    parallel: int,
+    output_dir: Path,
+    force: bool = False,
+) -> list[dict]:
+    """
+    Run every config x prompt variant concurrently, at most `parallel` at a time.
+
+    Gemini calls run on threads; CPU-bound scoring runs on a process pool.
+    """
+    semaphore = asyncio.Semaphore(parallel)
+    total = len(CONFIGS_TO_TEST) * len(PROMPT_VARIANTS)
+    completed = 0
+
+    async def run_one(config: TestConfig, prompt_variant: str) -> dict:
+        nonlocal completed
+        async with semaphore:
+            result = await run_refinement_test(
+                config, prompt_variant, ocr_fields, page, benchmark,
+                output_dir, score_pool, force,
+            )
+
+        completed += 1
+        if result["error"]:
+            print(f"    [{completed}/{total}] {result['config']}: ERROR - {result['error'][:50]}")
+        else:
+            print(f"    [{completed}/{total}] {result['config']}: {result['score']['overall_score']:.1f}%")
+        return result
+
+    with ProcessPoolExecutor(max_workers=min(total, os.cpu_count() or 1)) as score_pool:
+        return await asyncio.gather(*[
+            run_one(config, prompt_variant)
+            for config in CONFIGS_TO_TEST
+            for prompt_variant in PROMPT_VARIANTS
+        ])
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Run Azure OCR refinement test")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL,
+                        help=f"Number of concurrent Gemini calls (default {DEFAULT_PARALLEL})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call Gemini; skip reading/writing the response cache "
+                             "and saved results (implies --force)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-run tests that already have a saved result")
+    args = parser.parse_args()
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    if args.no_cache:
+        llm_cache.disable()
+
+    # Deferred so --help doesn't load scipy/Levenshtein
+    from evaluation.scorer import score_extraction
+
     print("=" * 60)
     print("REFINEMENT TEST: Can Gemini fix Azure OCR output?")
     print("=" * 60)
@@ -143,7 +265,8 @@ def main():
     # Get page image
     pdf_path = "/Users/allisterhercus/Documents/Labs/smart-form/docs/tests/Prep Questionnaire 2025.pdf"
     print(f"  Loading PDF: {pdf_path}")
-    image_base64, page_image = get_page_image_base64(pdf_path)
+    # Gemini image and full-resolution page come from one rasterization
+    page = image_cache.get_page_bundle(pdf_path)
 
     # First, score the raw Azure output as baseline
     print()
@@ -166,26 +289,18 @@ def main():
     print()
     print(f"Running {len(CONFIGS_TO_TEST) * len(PROMPT_VARIANTS)} refinement tests...")
 
-    results = []
-    for config in CONFIGS_TO_TEST:
-        for prompt_variant in PROMPT_VARIANTS:
-            result = run_refinement_test(
-                config, prompt_variant, ocr_fields, image_base64, benchmark
-            )
-            results.append(result)
-
-            if result["error"]:
-                print(f"    [{len(results)}/{len(CONFIGS_TO_TEST) * len(PROMPT_VARIANTS)}] {result['config']}: ERROR - {result['error'][:50]}")
-            else:
-                print(f"    [{len(results)}/{len(CONFIGS_TO_TEST) * len(PROMPT_VARIANTS)}] {result['config']}: {result['score']['overall_score']:.1f}%")
-
-    # Save results
+    # Each test writes its own JSON here as it completes
     output_dir = Path("results/refinement")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    for result in results:
-        with open(output_dir / f"{result['config']}.json", "w") as f:
-            json.dump(result, f, indent=2)
+    results = asyncio.run(run_all_tests(
+        ocr_fields, page, benchmark, args.parallel, output_dir, args.force or args.no_cache
+    ))
+
+    # Gemini calls are done; keep only the full-resolution page so the
+    # base64 copy of the image is freed
+    page_image = page.pil
+    del page
 
     # Save summary
     summary = {
@@ -204,8 +319,8 @@ def main():
         ],
     }
 
-    with open(output_dir / "summary.json", "w") as f:
-        json.dump(summary, f, indent=2)
+    with open(output_dir / "summary.json", "wb") as f:
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
 
     # Generate visualizations
     print()
@@ -213,17 +328,22 @@ def main():
     vis_dir = output_dir / "visualizations"
     vis_dir.mkdir(exist_ok=True)
 
-    # Azure baseline visualization
-    azure_vis = render_fields_on_image(page_image, ocr_fields)
-    azure_vis.save(vis_dir / "azure_baseline.png")
-    print(f"  Saved: azure_baseline.png")
-
-    # Each result visualization
-    for result in results:
-        if result["fields"]:
-            vis = render_fields_on_image(page_image, result["fields"])
-            vis.save(vis_dir / f"{result['config']}.png")
-            print(f"  Saved: {result['config']}.png")
+    # Azure baseline plus each result; PNG encoding releases the GIL,
+    # so the saves overlap across threads
+    vis_jobs = [("azure_baseline", ocr_fields)] + [
+        (result["config"], result["fields"]) for result in results if result["fields"]
+    ]
+    with ThreadPoolExecutor(max_workers=min(len(vis_jobs), os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(save_visualization, page_image, fields, vis_dir / f"{name}.png")
+            for name, fields in vis_jobs
+        ]
+        for future in as_completed(futures):
+            print(f"  Saved: {future.result().name}")
+
+    # Each rendered copy is dropped once saved; release the page as well
+    del page_image
+    gc.collect()
 
     # Print summary
     print()
@@ -235,12 +355,15 @@ def main():
     print("-" * 70)
     print(f"{'Azure Baseline':<30} {azure_scores['overall_score']:>9.1f}% {azure_scores['avg_iou']:>9.1f}% {azure_scores['type_accuracy']:>9.1f}% {'-':>10}")
 
+    # Build the table and write it in one go
+    rows = []
     for r in sorted(results, key=lambda x: (x["score"]["overall_score"] if x["score"] else 0), reverse=True):
         if r["score"]:
             improvement = r["score"]["overall_score"] - azure_scores["overall_score"]
-            print(f"{r['config']:<30} {r['score']['overall_score']:>9.1f}% {r['score']['avg_iou']:>9.1f}% {r['score']['type_accuracy']:>9.1f}% {improvement:>+9.1f}%")
+            rows.append(f"{r['config']:<30} {r['score']['overall_score']:>9.1f}% {r['score']['avg_iou']:>9.1f}% {r['score']['type_accuracy']:>9.1f}% {improvement:>+9.1f}%")
         else:
-            print(f"{r['config']:<30} {'ERROR':>10} {'-':>10} {'-':>10} {'-':>10}")
+            rows.append(f"{r['config']:<30} {'ERROR':>10} {'-':>10} {'-':>10} {'-':>10}")
+    print("\n".join(rows))
 
     print()
     print(f"Results saved to: {output_dir}")
@@ -11,13 +11,15 @@ Tests whether mentioning rulers in the prompt helps or hurts
 when no rulers are actually present on the image.
 """
 
-import json
 import sys
 import time
 from pathlib import Path
 
+import orjson
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.benchmark_loader import load_benchmark
 from core.field_extractor import FieldExtractor, ExtractorConfig, run_extraction_test
 from evaluation.scorer import score_extraction
 
@@ -43,13 +45,6 @@ CONFIGS = [
 ]
 
 
-def load_benchmark() -> list[dict]:
-    """Load ground truth benchmark."""
-    with open("benchmark/prep_questionnaire_page1.json") as f:
-        data = json.load(f)
-    return data["fields"]
-
-
 def main():
     print("=" * 70)
     print("RULER PROMPT COMPARISON TEST")
@@ -128,8 +123,8 @@ def main():
     output_dir = Path("results/ruler_prompt_comparison")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(output_dir / "results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    with open(output_dir / "results.json", "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
 
     print()
     print(f"Results saved to: {output_dir}/results.json")
@@ -4,14 +4,30 @@ Visualization tool for rendering benchmark fields onto PDF page images.
 Used to visually verify field coordinates and compare extraction results.
 """
 
-import json
+import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
-from pdf2image import convert_from_path
+import numpy as np
+import orjson
 from PIL import Image, ImageDraw, ImageFont
 
+# PyMuPDF's own module name (1.24.3+); "fitz" can resolve to an
+# unrelated PyPI package of that name
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+
+# "pymupdf" rasterizes in-process (no pdftoppm subprocess or PPM detour)
+# and is typically several times faster; needs `pip install pymupdf`
+PdfBackend = Literal["pdf2image", "pymupdf"]
+
 
 # Color scheme by field type (matching the TS implementation)
 FIELD_COLORS = {
@@ -41,12 +57,88 @@ def hex_to_rgba(hex_color: str, alpha: int = 255) -> tuple[int, int, int, int]:
     return (r, g, b, alpha)
 
 
+# FIELD_COLORS parsed once at import, so the draw loop never touches hex strings
+_FIELD_RGB = {field_type: hex_to_rgb(color) for field_type, color in FIELD_COLORS.items()}
+
+
+@lru_cache(maxsize=8)
+def _get_font(size: int):
+    """Load the label font once per size, falling back to Pillow's default."""
+    try:
+        return ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+# Scratch surface for measuring label text outside any page
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@lru_cache(maxsize=4096)
+def _label_bbox(label: str, font) -> tuple[int, int, int, int]:
+    """
+    Bounding box of a label drawn at (0, 0), cached per (label, font).
+
+    Fonts come from _get_font, so the same object (and cache key) is
+    reused across fields and pages.
+    """
+    return _MEASURE_DRAW.textbbox((0, 0), label, font=font)
+
+
+def _date_segment_boxes(field: dict, color, label: str, show_labels: bool, font, font_small) -> list[tuple]:
+    """One box per linkedDate segment."""
+    return [
+        (seg, color, f"{label} ({seg.get('part', '')})" if show_labels else None, font_small, None)
+        for seg in field["dateSegments"]
+    ]
+
+
+def _linked_segment_boxes(field: dict, color, label: str, show_labels: bool, font, font_small) -> list[tuple]:
+    """One box per linkedText segment."""
+    return [
+        (seg, color, f"{label} (seg {i+1})" if show_labels else None, font_small, None)
+        for i, seg in enumerate(field["segments"])
+    ]
+
+
+def _table_boxes(field: dict, color, label: str, show_labels: bool, font, font_small) -> list[tuple]:
+    """The table boundary, drawn with its cell grid."""
+    table_config = field["tableConfig"]
+    return [(table_config.get("coordinates", {}), color, label if show_labels else None, font, table_config)]
+
+
+# Box builders for fields without their own coordinates, in priority order
+_SPECIAL_BOXES = {
+    "dateSegments": _date_segment_boxes,
+    "segments": _linked_segment_boxes,
+    "tableConfig": _table_boxes,
+}
+
+
+def _classify(field: dict) -> Optional[str]:
+    """
+    Which kind of box a field draws as: "rect" for fields with their own
+    coordinates, else the first matching _SPECIAL_BOXES key, else None (skipped).
+    """
+    if field.get("coordinates", field.get("box")):
+        return "rect"
+    return next((key for key in _SPECIAL_BOXES if key in field), None)
+
+
+def _field_color(field: dict) -> tuple[int, int, int]:
+    """Stroke color for a field's type."""
+    field_type = field.get("fieldType", field.get("type", "unknown")).lower()
+    return _FIELD_RGB.get(field_type, _FIELD_RGB["unknown"])
+
+
 def render_fields_on_image(
     image: Image.Image,
     fields: list[dict],
     show_labels: bool = True,
     fill_opacity: int = 50,  # 0-255
-    stroke_width: int = 2
+    stroke_width: int = 2,
+    *,
+    inplace: bool = False
 ) -> Image.Image:
     """
     Render field rectangles onto an image.
@@ -57,220 +149,377 @@ def render_fields_on_image(
         show_labels: Whether to show field labels
         fill_opacity: Opacity of fill (0-255)
         stroke_width: Width of border stroke
+        inplace: Draw directly on `image` (must be RGB) instead of a copy,
+            for callers that save the result and discard the page
 
     Returns:
-        Image with fields drawn on it
+        Image with fields drawn on it (`image` itself when inplace)
     """
-    # Create a copy to avoid modifying original
-    result = image.copy().convert("RGBA")
-    width, height = result.size
+    if inplace and image.mode != "RGB":
+        raise ValueError(f"inplace rendering needs an RGB image, got {image.mode}")
 
-    # Create overlay for semi-transparent fills
-    overlay = Image.new("RGBA", result.size, (255, 255, 255, 0))
-    draw_overlay = ImageDraw.Draw(overlay)
+    width, height = image.size
 
-    # Create draw object for strokes and text
-    draw = ImageDraw.Draw(result)
-
-    # Try to load a font, fall back to default
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 12)
-        font_small = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 10)
-    except:
-        font = ImageFont.load_default()
-        font_small = font
+    # Fonts are parsed once per process, not per page
+    font = _get_font(12)
+    font_small = _get_font(10)
 
+    # Partition fields once, then flatten each group into boxes so all
+    # percentage coordinates are converted to pixels in one array op:
+    # (coords, color, label, font, table_config)
+    groups = defaultdict(list)
     for field in fields:
-        field_type = field.get("fieldType", field.get("type", "unknown")).lower()
-        color = FIELD_COLORS.get(field_type, FIELD_COLORS["unknown"])
-        label = field.get("label", "")
-
-        # Get coordinates
-        coords = field.get("coordinates", field.get("box", {}))
-        if not coords:
-            # Check for special types with segments
-            if "dateSegments" in field:
-                # Draw each date segment
-                for seg in field["dateSegments"]:
-                    _draw_rect(
-                        draw_overlay, draw, width, height,
-                        seg, color, fill_opacity, stroke_width,
-                        f"{label} ({seg.get('part', '')})" if show_labels else None,
-                        font_small
-                    )
-                continue
-            elif "segments" in field:
-                # Draw each linkedText segment
-                for i, seg in enumerate(field["segments"]):
-                    _draw_rect(
-                        draw_overlay, draw, width, height,
-                        seg, color, fill_opacity, stroke_width,
-                        f"{label} (seg {i+1})" if show_labels else None,
-                        font_small
-                    )
-                continue
-            elif "tableConfig" in field:
-                # Draw table boundary and cells
-                table_config = field["tableConfig"]
-                table_coords = table_config.get("coordinates", {})
-                _draw_table(
-                    draw_overlay, draw, width, height,
-                    table_coords, table_config, color, fill_opacity, stroke_width,
-                    label if show_labels else None, font, font_small
-                )
-                continue
-            else:
-                continue
-
-        _draw_rect(
-            draw_overlay, draw, width, height,
-            coords, color, fill_opacity, stroke_width,
-            label if show_labels else None, font
+        groups[_classify(field)].append(field)
+
+    # Plain boxes first, then segment and table fields
+    boxes = [
+        (
+            field.get("coordinates") or field["box"], _field_color(field),
+            field.get("label", "") if show_labels else None, font, None
         )
+        for field in groups["rect"]
+    ]
+    for kind, build_boxes in _SPECIAL_BOXES.items():
+        for field in groups[kind]:
+            boxes.extend(build_boxes(
+                field, _field_color(field), field.get("label", ""), show_labels, font, font_small
+            ))
+
+    pixel_boxes = _to_pixel_boxes([box[0] for box in boxes], width, height)
+
+    # Drop boxes with nothing on the image before any drawing work
+    visible = _visible_mask(pixel_boxes, width, height)
+    boxes = [box for box, keep in zip(boxes, visible.tolist()) if keep]
+    pixel_boxes = pixel_boxes[visible].tolist()
+
+    # Convert makes a copy, so the original is not modified
+    result = image if inplace else image.convert("RGB")
+
+    draw = ImageDraw.Draw(result)
 
-    # Composite overlay onto result
-    result = Image.alpha_composite(result, overlay)
+    # Strokes, grids and labels first; the fills then go over them, as
+    # they did with the old full-page overlay
+    for (_, color, label, box_font, table_config), xy in zip(boxes, pixel_boxes):
+        if table_config is None:
+            _draw_rect(draw, xy, color, stroke_width, label, box_font)
+        else:
+            _paint_grid(result, xy, table_config, color)
+            _draw_table(
+                draw, xy, table_config,
+                color, stroke_width, label, font, font_small
+            )
+
+    # Blend fills box by box (tables at half opacity)
+    for (_, color, _, _, table_config), xy in zip(boxes, pixel_boxes):
+        alpha = fill_opacity if table_config is None else fill_opacity // 2
+        _paint_box(result, xy, color, alpha)
+
+    return result
+
+
+def _to_pixel_boxes(coords_list: list[dict], img_width: int, img_height: int) -> np.ndarray:
+    """
+    Convert percentage coordinates to pixel boxes in one vectorized pass.
+
+    Args:
+        coords_list: Coordinate dicts (left/top or x/y, plus width/height)
+        img_width: Image width in pixels
+        img_height: Image height in pixels
+
+    Returns:
+        (N, 4) array with an [x1, y1, x2, y2] pixel box per coordinate dict
+    """
+    # Support both left/top and x/y naming conventions
+    pct = np.array([
+        [
+            coords.get("left", coords.get("x", 0)),
+            coords.get("top", coords.get("y", 0)),
+            coords.get("width", 0),
+            coords.get("height", 0),
+        ]
+        for coords in coords_list
+    ], dtype=np.float64).reshape(-1, 4)
+
+    # Right/bottom edges, then scale all four columns at once
+    pct[:, 2:] += pct[:, :2]
+    scale = np.array([img_width, img_height, img_width, img_height], dtype=np.float64)
+    return (pct / 100 * scale).astype(np.int32)
+
+
+def _visible_mask(pixel_boxes: np.ndarray, img_width: int, img_height: int) -> np.ndarray:
+    """
+    Which pixel boxes are worth drawing.
+
+    False for boxes entirely outside the image and for inverted boxes
+    (negative width/height from bad coordinates, which Pillow rejects).
+    Zero-size boxes are kept; they still draw as a line.
+    """
+    x1, y1, x2, y2 = pixel_boxes.T
+    return (
+        (x2 >= 0) & (y2 >= 0) & (x1 < img_width) & (y1 < img_height)
+        & (x2 >= x1) & (y2 >= y1)
+    )
+
+
+def _paint_box(image: Image.Image, xy: list[int], rgb: tuple[int, int, int], alpha: int):
+    """
+    Blend a box's fill into an RGB image in place.
+
+    Only the pixels under the box go through NumPy, so there is no
+    full-page array or overlay.
+    """
+    if alpha <= 0:
+        return
 
-    return result.convert("RGB")
+    img_width, img_height = image.size
+    x1, y1, x2, y2 = xy
+
+    # Boxes include x2/y2; clip to the image
+    left, top = max(x1, 0), max(y1, 0)
+    right, bottom = min(x2 + 1, img_width), min(y2 + 1, img_height)
+    if left >= right or top >= bottom:
+        return
+
+    patch = np.array(image.crop((left, top, right, bottom)))
+    _blend_fill(patch, [x1 - left, y1 - top, x2 - left, y2 - top], rgb, alpha)
+    image.paste(Image.fromarray(patch), (left, top))
+
+
+def _paint_grid(image: Image.Image, xy: list[int], table_config: dict, rgb: tuple[int, int, int]):
+    """Draw a table's cell grid into an RGB image in place."""
+    img_width, img_height = image.size
+    x1, y1, x2, y2 = xy
+
+    col_xs, row_ys = _grid_lines(xy, table_config)
+
+    # Positions past 100% put grid lines outside the box; cover them too
+    left, top, right, bottom = x1, y1, x2, y2
+    if col_xs.size:
+        left, right = min(left, int(col_xs.min())), max(right, int(col_xs.max()))
+    if row_ys.size:
+        top, bottom = min(top, int(row_ys.min())), max(bottom, int(row_ys.max()))
+
+    # Lines include x2/y2; clip to the image
+    left, top = max(left, 0), max(top, 0)
+    right, bottom = min(right + 1, img_width), min(bottom + 1, img_height)
+    if left >= right or top >= bottom:
+        return
+
+    patch = np.array(image.crop((left, top, right, bottom)))
+    _draw_grid(patch, [x1 - left, y1 - top, x2 - left, y2 - top], col_xs - left, row_ys - top, rgb)
+    image.paste(Image.fromarray(patch), (left, top))
+
+
+def _blend_fill(pixels: np.ndarray, xy: list[int], rgb: tuple[int, int, int], alpha: int):
+    """
+    Alpha-blend a solid color into an (H, W, 3) pixel array over a box.
+
+    The box is inclusive of x2/y2 and rounding matches Pillow's RGBA
+    blend, so a fill looks the same as draw.rectangle(fill=(*rgb, alpha)).
+    """
+    img_height, img_width = pixels.shape[:2]
+    x1, y1, x2, y2 = xy
+
+    # Clip to the image (negative indices would wrap around)
+    x1, y1 = max(x1, 0), max(y1, 0)
+    x2, y2 = min(x2 + 1, img_width), min(y2 + 1, img_height)
+    if alpha <= 0 or x1 >= x2 or y1 >= y2:
+        return
+
+    region = pixels[y1:y2, x1:x2]
+    blended = (
+        region.astype(np.uint32) * (255 - alpha)
+        + np.array(rgb, dtype=np.uint32) * alpha
+        + 128
+    )
+    region[...] = (blended + (blended >> 8)) >> 8
 
 
 def _draw_rect(
-    draw_overlay: ImageDraw.ImageDraw,
     draw: ImageDraw.ImageDraw,
-    img_width: int,
-    img_height: int,
-    coords: dict,
-    color: str,
-    fill_opacity: int,
+    xy: list[int],
+    stroke_color: tuple[int, int, int],
     stroke_width: int,
     label: Optional[str],
     font
 ):
-    """Draw a single rectangle with optional label."""
-    # Convert percentage coordinates to pixels
-    # Support both left/top and x/y naming conventions
-    left_pct = coords.get("left", coords.get("x", 0))
-    top_pct = coords.get("top", coords.get("y", 0))
-    width_pct = coords.get("width", 0)
-    height_pct = coords.get("height", 0)
-
-    x1 = int((left_pct / 100) * img_width)
-    y1 = int((top_pct / 100) * img_height)
-    x2 = int(((left_pct + width_pct) / 100) * img_width)
-    y2 = int(((top_pct + height_pct) / 100) * img_height)
-
-    # Draw semi-transparent fill
-    fill_color = hex_to_rgba(color, fill_opacity)
-    draw_overlay.rectangle([x1, y1, x2, y2], fill=fill_color)
-
-    # Draw border stroke
-    stroke_color = hex_to_rgb(color)
+    """Draw a single rectangle (pixel box from _to_pixel_boxes) with optional label."""
+    x1, y1, x2, y2 = xy
+
+    # Draw border stroke (the fill is blended over it by _paint_box)
     draw.rectangle([x1, y1, x2, y2], outline=stroke_color, width=stroke_width)
 
     # Draw label above the box
     if label:
-        # White background for readability
-        text_bbox = draw.textbbox((x1, y1 - 15), label, font=font)
-        draw.rectangle(
-            [text_bbox[0] - 2, text_bbox[1] - 1, text_bbox[2] + 2, text_bbox[3] + 1],
-            fill=(255, 255, 255, 200)
-        )
-        draw.text((x1, y1 - 15), label, fill=stroke_color, font=font)
+        _draw_label(draw, x1, y1 - 15, label, stroke_color, font)
 
 
-def _draw_table(
-    draw_overlay: ImageDraw.ImageDraw,
+def _draw_label(
     draw: ImageDraw.ImageDraw,
-    img_width: int,
-    img_height: int,
-    coords: dict,
-    table_config: dict,
-    color: str,
-    fill_opacity: int,
-    stroke_width: int,
-    label: Optional[str],
-    font,
-    font_small
+    x: int,
+    y: int,
+    label: str,
+    color: tuple[int, int, int],
+    font
 ):
-    """Draw a table with cell grid."""
-    # Convert percentage coordinates to pixels
-    left_pct = coords.get("left", 0)
-    top_pct = coords.get("top", 0)
-    width_pct = coords.get("width", 0)
-    height_pct = coords.get("height", 0)
-
-    x1 = int((left_pct / 100) * img_width)
-    y1 = int((top_pct / 100) * img_height)
-    x2 = int(((left_pct + width_pct) / 100) * img_width)
-    y2 = int(((top_pct + height_pct) / 100) * img_height)
+    """Draw a label at (x, y) on a white background for readability."""
+    # Keep labels of fields at the top edge on the image
+    y = max(y, 0)
+
+    # Measured once per label/font, then shifted to (x, y)
+    left, top, right, bottom = _label_bbox(label, font)
+    draw.rectangle(
+        [x + left - 2, y + top - 1, x + right + 2, y + bottom + 1],
+        fill=(255, 255, 255)
+    )
+    draw.text((x, y), label, fill=color, font=font)
+
+
+def _grid_lines(xy: list[int], table_config: dict) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pixel positions of a table's column and row lines.
+
+    Returns:
+        (x of each column line, y of each row line)
+    """
+    x1, y1, x2, y2 = xy
 
     table_width = x2 - x1
     table_height = y2 - y1
 
-    # Draw table boundary
-    fill_color = hex_to_rgba(color, fill_opacity // 2)
-    draw_overlay.rectangle([x1, y1, x2, y2], fill=fill_color)
-    stroke_color = hex_to_rgb(color)
-    draw.rectangle([x1, y1, x2, y2], outline=stroke_color, width=stroke_width + 1)
-
-    # Draw column lines
+    # Column lines
     column_headers = table_config.get("columnHeaders", [])
     column_positions = table_config.get("columnPositions", None)
     num_cols = len(column_headers)
 
     if column_positions:
-        # Use specified positions
-        for pos in column_positions[1:-1]:  # Skip 0 and 100
-            col_x = x1 + int((pos / 100) * table_width)
-            draw.line([(col_x, y1), (col_x, y2)], fill=stroke_color, width=1)
+        # Use specified positions, skipping 0 and 100
+        col_xs = x1 + (np.asarray(column_positions[1:-1], dtype=np.float64) / 100 * table_width).astype(int)
     elif num_cols > 0:
         # Uniform columns
-        col_width = table_width / num_cols
-        for i in range(1, num_cols):
-            col_x = x1 + int(i * col_width)
-            draw.line([(col_x, y1), (col_x, y2)], fill=stroke_color, width=1)
+        col_xs = x1 + (np.arange(1, num_cols) * (table_width / num_cols)).astype(int)
+    else:
+        col_xs = np.empty(0, dtype=int)
 
-    # Draw row lines
+    # Row lines
     data_rows = table_config.get("dataRows", 1)
     row_heights = table_config.get("rowHeights", None)
     total_rows = data_rows + 1  # +1 for header
 
     if row_heights:
         # Use specified heights
-        cumulative = 0
-        for h in row_heights[:-1]:
-            cumulative += h
-            row_y = y1 + int((cumulative / 100) * table_height)
-            draw.line([(x1, row_y), (x2, row_y)], fill=stroke_color, width=1)
+        cumulative = np.cumsum(np.asarray(row_heights[:-1], dtype=np.float64))
+        row_ys = y1 + (cumulative / 100 * table_height).astype(int)
     else:
         # Uniform rows
-        row_height = table_height / total_rows
-        for i in range(1, total_rows):
-            row_y = y1 + int(i * row_height)
-            draw.line([(x1, row_y), (x2, row_y)], fill=stroke_color, width=1)
+        row_ys = y1 + (np.arange(1, total_rows) * (table_height / total_rows)).astype(int)
+
+    return col_xs, row_ys
+
+
+def _draw_grid(
+    pixels: np.ndarray,
+    xy: list[int],
+    col_xs: np.ndarray,
+    row_ys: np.ndarray,
+    stroke_color: tuple[int, int, int]
+):
+    """
+    Draw a table's 1px column and row lines (from _grid_lines) straight
+    into an (H, W, 3) pixel array: one assignment for all columns and
+    one for all rows.
+    """
+    img_height, img_width = pixels.shape[:2]
+    x1, y1, x2, y2 = xy
+
+    # Lines include both end points, clipped to the image like Pillow does
+    col_xs = col_xs[(col_xs >= 0) & (col_xs < img_width)]
+    row_ys = row_ys[(row_ys >= 0) & (row_ys < img_height)]
+    pixels[max(y1, 0):max(y2 + 1, 0), col_xs] = stroke_color
+    pixels[row_ys, max(x1, 0):max(x2 + 1, 0)] = stroke_color
+
+
+def _draw_table(
+    draw: ImageDraw.ImageDraw,
+    xy: list[int],
+    table_config: dict,
+    stroke_color: tuple[int, int, int],
+    stroke_width: int,
+    label: Optional[str],
+    font,
+    font_small
+):
+    """Draw a table's boundary, label and column headers (grid is from _paint_grid)."""
+    x1, y1, x2, y2 = xy
+
+    table_width = x2 - x1
+
+    # Draw table boundary
+    draw.rectangle([x1, y1, x2, y2], outline=stroke_color, width=stroke_width + 1)
 
     # Draw label above the table
     if label:
-        text_bbox = draw.textbbox((x1, y1 - 18), label, font=font)
-        draw.rectangle(
-            [text_bbox[0] - 2, text_bbox[1] - 1, text_bbox[2] + 2, text_bbox[3] + 1],
-            fill=(255, 255, 255, 200)
-        )
-        draw.text((x1, y1 - 18), label, fill=stroke_color, font=font)
+        _draw_label(draw, x1, y1 - 18, label, stroke_color, font)
+
+    # Draw column headers, centred in their columns
+    column_headers = table_config.get("columnHeaders", [])
+    column_positions = table_config.get("columnPositions", None)
+    num_cols = len(column_headers)
 
-    # Draw column headers
     if column_headers:
         if column_positions:
-            for i, header in enumerate(column_headers):
-                col_start = column_positions[i] if i < len(column_positions) else 0
-                col_end = column_positions[i + 1] if i + 1 < len(column_positions) else 100
-                col_x = x1 + int(((col_start + col_end) / 2 / 100) * table_width) - 20
-                draw.text((col_x, y1 + 2), header[:10], fill=(100, 100, 100), font=font_small)
+            # Column i spans positions[i]..positions[i + 1]; missing
+            # entries default to 0 (start) and 100 (end)
+            positions = np.asarray(column_positions, dtype=np.float64)
+            starts = np.zeros(num_cols)
+            ends = np.full(num_cols, 100.0)
+            starts[:min(num_cols, len(positions))] = positions[:num_cols]
+            ends[:min(num_cols, len(positions) - 1)] = positions[1:num_cols + 1]
+            col_xs = x1 + ((starts + ends) / 2 / 100 * table_width).astype(int) - 20
         else:
-            col_width = table_width / num_cols
-            for i, header in enumerate(column_headers):
-                col_x = x1 + int((i + 0.5) * col_width) - 20
-                draw.text((col_x, y1 + 2), header[:10], fill=(100, 100, 100), font=font_small)
+            col_xs = x1 + ((np.arange(num_cols) + 0.5) * (table_width / num_cols)).astype(int) - 20
+
+        for header, col_x in zip(column_headers, col_xs.tolist()):
+            draw.text((col_x, y1 + 2), header[:10], fill=(100, 100, 100), font=font_small)
+
+
+def _rasterize_page(
+    pdf_path: str,
+    page_number: int,
+    dpi: int,
+    backend: PdfBackend,
+    cache: bool = True
+) -> Image.Image:
+    """
+    Convert one PDF page to an RGB image.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_number: Which page to convert (0-indexed)
+        dpi: DPI for PDF conversion
+        backend: "pdf2image" (Poppler) or "pymupdf"
+        cache: Keep pdf2image pages in results/.image_cache (core.raster_cache,
+            shared with the benchmark scripts); turn off for one-off PDFs
+
+    Returns:
+        PIL Image of the page
+    """
+    if backend == "pymupdf":
+        if pymupdf is None:
+            raise ImportError("backend='pymupdf' needs PyMuPDF (pip install pymupdf)")
+        with pymupdf.open(pdf_path) as doc:
+            pixmap = doc[page_number].get_pixmap(dpi=dpi)
+            return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+    if backend != "pdf2image":
+        raise ValueError(f"Unknown PDF backend: {backend}")
+
+    # Deferred so rendering onto an existing image never loads core
+    from core.raster_cache import get_page_image, rasterize
+
+    if not cache:
+        return rasterize(pdf_path, page_number, dpi)
+    return get_page_image(pdf_path, page_number, dpi)
 
 
 def render_benchmark(
@@ -278,7 +527,9 @@ def render_benchmark(
     benchmark_json_path: str,
     output_png_path: str,
     page_number: int = 0,
-    dpi: int = 150
+    dpi: int = 150,
+    backend: PdfBackend = "pdf2image",
+    cache: bool = True
 ):
     """
     Render benchmark fields onto a PDF page.
@@ -289,32 +540,30 @@ def render_benchmark(
         output_png_path: Path to save the output PNG
         page_number: Which page to render (0-indexed)
         dpi: DPI for PDF conversion
+        backend: PDF rasterizer, "pdf2image" (Poppler) or "pymupdf"
+        cache: Use the on-disk page cache (pdf2image only)
     """
     # Convert PDF page to image
     print(f"Converting PDF page {page_number + 1} to image...")
-    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number + 1, last_page=page_number + 1)
-
-    if not images:
-        raise ValueError(f"Could not convert page {page_number + 1} from PDF")
-
-    page_image = images[0]
+    page_image = _rasterize_page(pdf_path, page_number, dpi, backend, cache)
     print(f"Page size: {page_image.size}")
 
     # Load benchmark JSON
     print(f"Loading benchmark from {benchmark_json_path}...")
-    with open(benchmark_json_path, "r") as f:
-        benchmark = json.load(f)
+    benchmark = orjson.loads(Path(benchmark_json_path).read_bytes())
 
     fields = benchmark.get("fields", [])
     print(f"Found {len(fields)} fields to render")
 
-    # Render fields onto image
-    result = render_fields_on_image(page_image, fields)
+    # Render fields onto image (the page is only needed for this output)
+    result = render_fields_on_image(page_image, fields, inplace=True)
 
     # Save result
     output_path = Path(output_png_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    result.save(output_png_path, "PNG")
+    # Fast zlib level: level 6 (the default) dominates save time on
+    # full-page images for a small size win
+    result.save(output_png_path, "PNG", compress_level=1)
     print(f"Saved visualization to {output_png_path}")
 
 
@@ -323,23 +572,84 @@ def render_extraction_result(
     extraction_json_path: str,
     output_png_path: str,
     page_number: int = 0,
-    dpi: int = 150
+    dpi: int = 150,
+    backend: PdfBackend = "pdf2image",
+    cache: bool = True
 ):
     """
     Render extraction results (from a test run) onto a PDF page.
     Same as render_benchmark but for test outputs.
     """
-    render_benchmark(pdf_path, extraction_json_path, output_png_path, page_number, dpi)
+    render_benchmark(pdf_path, extraction_json_path, output_png_path, page_number, dpi, backend, cache)
+
+
+def render_benchmark_pages(
+    pdf_path: str,
+    benchmark_json_template: str,
+    output_png_template: str,
+    page_numbers: list[int],
+    dpi: int = 150,
+    max_workers: Optional[int] = None,
+    backend: PdfBackend = "pdf2image",
+    cache: bool = True
+) -> list[str]:
+    """
+    Render benchmark fields onto several PDF pages in parallel.
+
+    Each page is rasterized and drawn in its own process (Poppler and
+    Pillow are CPU-bound), and each worker only converts its own page.
+
+    Args:
+        pdf_path: Path to the PDF file
+        benchmark_json_template: Benchmark JSON path with a {page} placeholder
+            (1-indexed, e.g. "benchmark/prep_questionnaire_page{page}.json")
+        output_png_template: Output PNG path with a {page} placeholder
+        page_numbers: Which pages to render (0-indexed)
+        dpi: DPI for PDF conversion
+        max_workers: Process count (default: one per page, up to the CPU count)
+        backend: PDF rasterizer, "pdf2image" (Poppler) or "pymupdf"
+        cache: Use the on-disk page cache (pdf2image only)
+
+    Returns:
+        Output PNG paths, in page_numbers order
+    """
+    json_paths = [benchmark_json_template.format(page=n + 1) for n in page_numbers]
+    png_paths = [output_png_template.format(page=n + 1) for n in page_numbers]
+
+    if max_workers is None:
+        max_workers = min(len(page_numbers), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        # list() so a failed page raises here
+        list(executor.map(
+            render_benchmark,
+            [pdf_path] * len(page_numbers), json_paths, png_paths,
+            page_numbers, [dpi] * len(page_numbers), [backend] * len(page_numbers),
+            [cache] * len(page_numbers)
+        ))
+
+    return png_paths
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print("Usage: python visualize_benchmark.py <pdf_path> <benchmark_json> <output_png>")
-        print("Example: python visualize_benchmark.py doc.pdf benchmark.json output.png")
+    # --no-cache: don't read or write page PNGs in results/.image_cache
+    cache = "--no-cache" not in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--no-cache"]
+
+    if len(args) < 3:
+        print("Usage: python -m tools.visualize_benchmark [--no-cache] <pdf_path> <benchmark_json> <output_png> [page ...]")
+        print("Example: python -m tools.visualize_benchmark doc.pdf benchmark.json output.png")
+        print("Example: python -m tools.visualize_benchmark doc.pdf bench_page{page}.json out_page{page}.png 1 2 3")
+        print("Example: python -m tools.visualize_benchmark --no-cache other.pdf fields.json output.png")
         sys.exit(1)
 
-    pdf_path = sys.argv[1]
-    benchmark_json = sys.argv[2]
-    output_png = sys.argv[3]
+    pdf_path = args[0]
+    benchmark_json = args[1]
+    output_png = args[2]
 
-    render_benchmark(pdf_path, benchmark_json, output_png)
+    if len(args) > 3:
+        # Pages are 1-indexed on the command line, like the {page} placeholder
+        pages = [int(page) - 1 for page in args[3:]]
+        render_benchmark_pages(pdf_path, benchmark_json, output_png, pages, cache=cache)
+    else:
+        render_benchmark(pdf_path, benchmark_json, output_png, cache=cache)